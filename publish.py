@@ -6,12 +6,45 @@
 
 import os
 import sys
+import json
+import stat
+import fcntl
+import functools
+import hashlib
 import subprocess
 import datetime
 import time
 import argparse
 import signal
 
+# The generator and daemon modules live in scripts/ and are imported in-process
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from file_output import merge_pending_changes, pending_lock, read_pending_changes, write_pending_changes
+from publish_history import REGRESSION_FACTOR, REPORT_RUNS, RunRecord, append_record, load_records, render_report
+
+# Profile report written by generate_index_files.py on every run
+GENERATOR_PROFILE = os.path.join(".cache", "generator_profile.json")
+# Change set written by generate_index_files.py on every run
+GENERATOR_CHANGES = os.path.join(".cache", "generator_changes.json")
+# Changed paths not yet pushed, every generator run adds its changes and a failed cycle is retried
+PENDING_CHANGES = os.path.join(".cache", "publish_pending.json")
+# Paths asked git for when the pending changes cannot be trusted to list everything
+STATUS_PATHS = [os.path.join("content", "pull_request"), os.path.join("content", "projects"), "static"]
+# NUL-separated pathspec file passed to git
+PATHSPEC_FILE = os.path.join(".cache", "publish_pathspec")
+# Fingerprint of the inputs of the last completed cycle
+FINGERPRINT_FILE = os.path.join(".cache", "publish_fingerprint.json")
+# Everything the generator reads: the PR corpus, the label filter and the scripts themselves
+FINGERPRINT_INPUTS = [os.path.join("content", "pull_request"), "config.toml", "scripts"]
+# Held while a cycle runs, so cron, manual and daemon runs never overlap
+LOCK_FILE = os.path.join(".cache", "publish.lock")
+# Unix socket the daemon accepts triggers on
+SOCKET_FILE = os.path.join(".cache", "publish.sock")
+# One JSON line per cycle, summarized by --report
+HISTORY_FILE = os.path.join(".cache", "publish_history.jsonl")
+
 def run_command(command, error_message=None):
     """
     Run a shell command and handle errors
@@ -36,10 +69,337 @@ def run_command(command, error_message=None):
         print(f"Error: {e.stderr}")
         return False
 
-def publish_blog():
+def run_generator(changes_path, profile_path):
+    """
+    Run generate_index_files in-process with a metadata store opened for this run only
+    
+    Args:
+        changes_path: Path the change set is written to
+        profile_path: Path the profile report is written to
+        
+    Returns:
+        The GenerateResult of the run
+    """
+    from generate_index_files import CONTENT_DIR, GenerateOptions, generate
+    return generate(CONTENT_DIR, GenerateOptions(changes=changes_path, profile=profile_path))
+
+def log_generator_cost(result):
+    """
+    Print a short summary of a generator run
+    
+    Args:
+        result: GenerateResult returned by generate_index_files.generate()
+    """
+    phases = ["scan", "process_markdown_files", "process_directory", "store_save"]
+    phase_times = ", ".join(f"{name} {result.timers[name]['seconds']:.2f}s"
+                            for name in phases if name in result.timers)
+    counters = result.counters
+    change_set = result.change_set
+    print(f"Generator cost: {result.wall_seconds:.2f}s ({result.mode}), "
+          f"{result.files_scanned} files scanned, {counters.get('files_skipped', 0)} skipped, "
+          f"{result.files_rewritten} rewritten, "
+          f"{counters.get('pr_bytes_read', 0)} bytes read, {counters.get('pr_bytes_written', 0)} bytes written")
+    if phase_times:
+        print(f"Generator phases: {phase_times}")
+    print(f"Generator output: {result.output_written} files written, {result.output_unchanged} unchanged, "
+          f"{len(change_set['created'])} created, {len(change_set['modified'])} modified, "
+          f"{len(change_set['deleted'])} deleted")
+
+def tree_fingerprint(paths):
+    """
+    Compute a cheap fingerprint of input trees from metadata only
+    
+    Every directory and file contributes its path, size and mtime to a rolling
+    hash. Directory mtimes catch added, removed and renamed entries, file
+    mtimes catch edits. No file content is read.
+    
+    Args:
+        paths: Files and directories to fingerprint
+        
+    Returns:
+        Tuple of the hex digest and the number of entries hashed
+    """
+    digest = hashlib.sha256()
+    count = 0
+    stack = list(reversed(paths))
+    while stack:
+        path = stack.pop()
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            digest.update(f"missing\0{path}\0".encode("utf-8"))
+            continue
+        digest.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\0".encode("utf-8"))
+        count += 1
+        if stat.S_ISDIR(st.st_mode):
+            # Hidden files and bytecode caches are not inputs
+            names = sorted((name for name in os.listdir(path)
+                            if not name.startswith(".") and name != "__pycache__"), reverse=True)
+            stack.extend(os.path.join(path, name) for name in names)
+    return digest.hexdigest(), count
+
+def load_fingerprint():
+    """
+    Load the fingerprint saved by the last completed cycle
+    
+    Returns:
+        Dictionary with the fingerprint and the time it was saved, or None
+    """
+    try:
+        with open(FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_fingerprint(fingerprint, count):
+    """
+    Save the fingerprint of the inputs after a completed cycle
+    
+    Args:
+        fingerprint: Hex digest of the input trees
+        count: Number of entries hashed
+    """
+    os.makedirs(os.path.dirname(FINGERPRINT_FILE), exist_ok=True)
+    with open(FINGERPRINT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "entries": count,
+                   "saved_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+
+def load_pending_changes():
+    """
+    Load the changed paths of earlier runs that are not pushed yet
+    
+    Returns:
+        Tuple of the dictionary of repository-relative path to change kind, and whether it lists every change
+    """
+    return read_pending_changes(PENDING_CHANGES)
+
+def update_pending_changes(change_sets):
+    """
+    Merge change sets into the pending changes of earlier unpublished runs
+    
+    Args:
+        change_sets: Change set dictionaries, or paths of JSON change sets written with --changes
+        
+    Returns:
+        Tuple of the pending paths and whether they are complete, or None if a change set is unreadable
+    """
+    repo_root = os.getcwd()
+    for change_set in change_sets:
+        if not isinstance(change_set, dict):
+            try:
+                with open(change_set, "r", encoding="utf-8") as f:
+                    change_set = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error: Cannot read change set {change_set}: {e}")
+                return None
+        merge_pending_changes(PENDING_CHANGES, change_set, repo_root)
+    return load_pending_changes()
+
+def status_changes(paths):
+    """
+    Ask git for the changed paths below paths, including untracked files
+    
+    Args:
+        paths: Repository-relative directories to check
+        
+    Returns:
+        Dictionary of repository-relative path to change kind, or None if git status failed
+    """
+    status = subprocess.run(["git", "status", "--porcelain", "-z", "--untracked-files=all", "--"] + paths,
+                            capture_output=True, text=True)
+    if status.returncode != 0:
+        print(f"Error: git status failed: {status.stderr.strip()}")
+        return None
+    
+    changes = {}
+    entries = iter(status.stdout.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        code, path = entry[:2], entry[3:]
+        if code == "??":
+            changes[path] = "created"
+        elif "D" in code:
+            changes[path] = "deleted"
+        else:
+            changes[path] = "modified"
+        # Renames and copies are followed by their source path
+        if code[0] in "RC":
+            source = next(entries, "")
+            if code[0] == "R" and source:
+                changes[source] = "deleted"
+    return changes
+
+def complete_pending_changes(changes):
+    """
+    Add the changes found by git to the pending changes and mark them complete
+    
+    Args:
+        changes: Dictionary of repository-relative path to change kind
+        
+    Returns:
+        Dictionary of repository-relative path to change kind
+    """
+    with pending_lock(PENDING_CHANGES):
+        pending, _ = read_pending_changes(PENDING_CHANGES)
+        pending.update(changes)
+        write_pending_changes(PENDING_CHANGES, pending)
+    return pending
+
+def clear_pending_changes(published):
+    """
+    Drop the published paths from the pending changes, keeping those changed again since they were read
+    
+    Args:
+        published: Dictionary of repository-relative path to change kind that was pushed
+    """
+    with pending_lock(PENDING_CHANGES):
+        pending, complete = read_pending_changes(PENDING_CHANGES)
+        for path, kind in published.items():
+            if pending.get(path) == kind:
+                del pending[path]
+        write_pending_changes(PENDING_CHANGES, pending, complete)
+
+def run_pathspec_command(command, paths, error_message):
+    """
+    Run a git command on a list of paths passed through a NUL-separated pathspec file
+    
+    Args:
+        command: The git command, without pathspec arguments
+        paths: Repository-relative paths
+        error_message: Custom error message to display on failure
+        
+    Returns:
+        True if command succeeded, False otherwise
+    """
+    with open(PATHSPEC_FILE, "w", encoding="utf-8") as f:
+        f.write("\0".join(paths))
+    return run_command(command + [f"--pathspec-from-file={PATHSPEC_FILE}", "--pathspec-file-nul"], error_message)
+
+def stage_changes(pending):
+    """
+    Stage exactly the pending paths: existing ones with git add, deleted ones with git rm --cached
+    
+    Args:
+        pending: Dictionary of repository-relative path to change kind
+        
+    Returns:
+        True if staging succeeded, False otherwise
+    """
+    existing = sorted(path for path in pending if os.path.lexists(path))
+    missing = sorted(path for path in pending if not os.path.lexists(path))
+    
+    # git add refuses untracked ignored paths, e.g. files below .cache/
+    if existing:
+        ignored = subprocess.run(["git", "check-ignore", "-z", "--stdin"], input="\0".join(existing),
+                                 capture_output=True, text=True).stdout.split("\0")
+        existing = [path for path in existing if path not in set(ignored)]
+    
+    if existing and not run_pathspec_command(["git", "add"], existing, "Failed to add changes to git. Aborting."):
+        return False
+    if missing and not run_pathspec_command(["git", "rm", "--cached", "--ignore-unmatch", "-q"], missing,
+                                            "Failed to stage deletions. Aborting."):
+        return False
+    print(f"Staged {len(existing)} changed and {len(missing)} deleted paths")
+    return True
+
+def publish_lock(func):
+    """
+    Run a publish cycle under an exclusive lock, skipping it while another cycle holds the lock
+    
+    Args:
+        func: The function running one cycle
+        
+    Returns:
+        The wrapped function
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        lock_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), LOCK_FILE)
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "a+") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.seek(0)
+                print(f"Another publish cycle is running ({lock.read().strip() or 'unknown process'}). Skipping.")
+                return 0
+            lock.truncate(0)
+            lock.write(f"pid {os.getpid()} since {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            lock.flush()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                lock.truncate(0)
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return wrapper
+
+def record_run(func):
+    """
+    Append the outcome, phase durations and counts of every publish cycle to the run history
+    
+    Args:
+        func: The function running one cycle, called with a RunRecord as run
+        
+    Returns:
+        The wrapped function
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        run = RunRecord()
+        status = None
+        try:
+            status = func(*args, run=run, **kwargs)
+            return status
+        finally:
+            history_path = os.path.join(os.path.dirname(SCRIPTS_DIR), HISTORY_FILE)
+            try:
+                append_record(history_path, run.finish(status))
+            except OSError as e:
+                print(f"Cannot record the run in {history_path}: {e}")
+    return wrapper
+
+def staged_paths():
+    """
+    List the paths staged for the next commit
+    
+    Returns:
+        Repository-relative paths
+    """
+    output = subprocess.run(["git", "diff", "--cached", "--name-only", "-z"],
+                            capture_output=True, text=True).stdout
+    return [path for path in output.split("\0") if path]
+
+def staged_line_changes():
+    """
+    Count the lines added and removed by the staged changes, binary files count as none
+    
+    Returns:
+        Number of changed lines
+    """
+    output = subprocess.run(["git", "diff", "--cached", "--numstat", "-z"],
+                            capture_output=True, text=True).stdout
+    lines = 0
+    for entry in output.split("\0"):
+        counts = entry.split("\t")
+        if len(counts) >= 2 and counts[0].isdigit() and counts[1].isdigit():
+            lines += int(counts[0]) + int(counts[1])
+    return lines
+
+@publish_lock
+@record_run
+def publish_blog(change_sets=(), scan=False, force=False, generator=None, run=None):
     """
     Execute the blog publishing process
     
+    Args:
+        change_sets: Additional change sets to stage, e.g. written by github_auto_publisher.py --changes
+        scan: Stage every change in the working tree instead of only the change sets
+        force: Run the cycle even when the inputs are unchanged since the last completed cycle
+        generator: Called with the change set and profile paths, returns a GenerateResult;
+            None uses run_generator(), the daemon passes its warm generator
+        run: RunRecord the phase durations and counts of this cycle are recorded in, set by record_run
+        
     Returns:
         0 if successful, non-zero otherwise
     """
@@ -51,58 +411,150 @@ def publish_blog():
     current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"Starting blog update at {current_time}")
     
+    # Skip the whole cycle when no input changed since the last completed one
+    fingerprint_inputs = FINGERPRINT_INPUTS + list(change_sets)
+    fingerprint_start = time.perf_counter()
+    fingerprint, entries = tree_fingerprint(fingerprint_inputs)
+    fingerprint_seconds = time.perf_counter() - fingerprint_start
+    run.set(fingerprint_seconds=round(fingerprint_seconds, 6), fingerprint_entries=entries,
+            forced=force, scan=scan, warm=generator is not None)
+    previous = load_fingerprint()
+    pending, complete = load_pending_changes()
+    has_pending = not scan and (bool(pending) or not complete)
+    if force:
+        print("Forced run, ignoring the input fingerprint.")
+    elif previous is None:
+        print("No saved input fingerprint, running a full cycle.")
+    elif has_pending:
+        print("Changes of an earlier cycle are not pushed yet, running a full cycle.")
+    elif previous["fingerprint"] == fingerprint:
+        print(f"Skipping cycle: inputs unchanged since the cycle completed at {previous['saved_at']} "
+              f"({entries} entries fingerprinted in {fingerprint_seconds:.3f}s, {fingerprint[:12]}). "
+              f"Use --force to run anyway.")
+        run.set(outcome="skipped")
+        return 0
+    else:
+        print(f"Inputs changed ({entries} entries fingerprinted in {fingerprint_seconds:.3f}s), running a full cycle.")
+    
     # Execute Python script to generate index files
     print("Generating index files...")
-    if not run_command(["python3", "scripts/generate_index_files.py"], 
-                      "Failed to generate index files. Aborting."):
+    try:
+        with run.phase("generator"):
+            result = (generator or run_generator)(GENERATOR_CHANGES, GENERATOR_PROFILE)
+    except Exception as e:
+        print("Error: Failed to generate index files. Aborting.")
+        print(f"Error: {e}")
+        return 1
+    if result.errors:
+        print("Error: Failed to generate index files. Aborting.")
+        for error in result.errors:
+            print(f"Error: {error}")
         return 1
+    log_generator_cost(result)
+    counters = result.counters
+    run.set(generator_mode=result.mode, files_scanned=result.files_scanned,
+            files_rewritten=result.files_rewritten, output_written=result.output_written,
+            generator_bytes_written=counters.get("pr_bytes_written", 0) + counters.get("index_bytes_written", 0))
     
-    # Check if there are any changes to commit
-    print("Checking for changes...")
-    status_result = subprocess.run(["git", "status", "--porcelain"], 
-                                  capture_output=True, 
-                                  text=True)
+    if scan:
+        # Check if there are any changes to commit
+        print("Checking for changes...")
+        with run.phase("git_status"):
+            status_result = subprocess.run(["git", "status", "--porcelain"], 
+                                          capture_output=True, 
+                                          text=True)
+        has_changes = bool(status_result.stdout.strip())
+        # git add . stages the pending paths along with everything else
+        pending, _ = load_pending_changes()
+    else:
+        # Only the paths reported changed by the generator runs and the publisher since the last push
+        loaded = update_pending_changes(change_sets)
+        if loaded is None:
+            return 1
+        pending, complete = loaded
+        if not complete or not pending:
+            # A full run cannot tell what it changed and hand edits are in no change set, ask git
+            print("Checking for changes not listed in the pending change set...")
+            with run.phase("git_status"):
+                changes = status_changes(STATUS_PATHS)
+            if changes is None:
+                return 1
+            pending = complete_pending_changes(changes)
+        has_changes = bool(pending)
     
     # If there are no changes, exit early
-    if not status_result.stdout.strip():
+    if not has_changes:
         print("No changes detected. Skipping commit and push.")
+        run.set(outcome="no_changes", paths_changed=0, bytes_staged=0, lines_changed=0)
+        # The generator may have rewritten inputs, fingerprint the tree as the next cycle will see it
+        save_fingerprint(*tree_fingerprint(fingerprint_inputs))
         print(f"Blog update completed successfully at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         return 0
     
-    # Add all changes to Git
-    print("Changes detected. Adding changes to git...")
-    if not run_command(["git", "add", "."], 
-                      "Failed to add changes to git. Aborting."):
-        return 1
+    if scan:
+        # Add all changes to Git
+        print("Changes detected. Adding changes to git...")
+        with run.phase("git_add"):
+            added = run_command(["git", "add", "."], 
+                                "Failed to add changes to git. Aborting.")
+        if not added:
+            return 1
+    else:
+        print(f"{len(pending)} changed paths. Adding changes to git...")
+        with run.phase("git_add"):
+            added = stage_changes(pending)
+        if not added:
+            return 1
+    
+    # Paths of an earlier run may already be committed, leaving only the push to retry
+    staged = staged_paths()
+    run.set(paths_changed=len(staged),
+            bytes_staged=sum(os.path.getsize(path) for path in staged if os.path.isfile(path)),
+            lines_changed=staged_line_changes())
     
     # Commit changes with current date as commit message
     commit_message = f"Blog auto update: {current_time}"
-    print(f"Committing changes with message: {commit_message}")
-    if not run_command(["git", "commit", "-m", commit_message], 
-                      "Failed to commit changes. Aborting."):
-        # If nothing to commit, this is not an error
-        if "nothing to commit" in subprocess.run(["git", "status"], 
-                                               capture_output=True, 
-                                               text=True).stdout:
-            print("No changes to commit. Continuing...")
-        else:
-            return 1
+    if not staged:
+        print("No changes to commit. Continuing...")
+    else:
+        print(f"Committing changes with message: {commit_message}")
+        with run.phase("git_commit"):
+            committed = run_command(["git", "commit", "-m", commit_message], 
+                                    "Failed to commit changes. Aborting.")
+        if not committed:
+            # If nothing to commit, this is not an error
+            if "nothing to commit" in subprocess.run(["git", "status"], 
+                                                   capture_output=True, 
+                                                   text=True).stdout:
+                print("No changes to commit. Continuing...")
+            else:
+                return 1
     
     # Push changes to remote repository
     print("Pushing changes to remote repository...")
-    if not run_command(["git", "push"], 
-                      "Failed to push changes. Aborting."):
+    with run.phase("git_push"):
+        pushed = run_command(["git", "push"], 
+                             "Failed to push changes. Aborting.")
+    if not pushed:
         return 1
+    run.set(outcome="published")
+    
+    # Everything staged is pushed, changes made meanwhile by other generator runs stay pending
+    clear_pending_changes(pending)
+    save_fingerprint(*tree_fingerprint(fingerprint_inputs))
     
     print(f"Blog update completed successfully at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     return 0
 
-def schedule_mode(interval_hours):
+def schedule_mode(interval_hours, change_sets=(), scan=False, force=False):
     """
     Run the publish operation periodically at specified interval
     
     Args:
         interval_hours: Interval in hours between executions
+        change_sets: Additional change sets to stage on every run
+        scan: Stage every change in the working tree instead of only the change sets
+        force: Run every cycle even when the inputs are unchanged
     """
     print(f"Starting scheduled mode. Will publish every {interval_hours} hours.")
     print("Press Ctrl+C to exit.")
@@ -116,7 +568,7 @@ def schedule_mode(interval_hours):
     
     while True:
         # Run the publish operation
-        publish_blog()
+        publish_blog(change_sets, scan, force)
         
         # Calculate next run time
         next_run = datetime.datetime.now() + datetime.timedelta(hours=interval_hours)
@@ -125,6 +577,87 @@ def schedule_mode(interval_hours):
         # Sleep until next run
         time.sleep(interval_hours * 3600)
 
+def daemon_mode(interval_hours=None, change_sets=(), scan=False, force=False):
+    """
+    Run as a resident daemon with the generator loaded, publishing on triggers and optionally on an interval
+    
+    Args:
+        interval_hours: Interval in hours between unprompted cycles, None to publish on triggers only
+        change_sets: Additional change sets to stage on every run
+        scan: Stage every change in the working tree instead of only the change sets
+        force: Run every cycle even when the inputs are unchanged
+        
+    Returns:
+        0 after a clean shutdown, non-zero if the daemon could not start
+    """
+    os.chdir(os.path.dirname(SCRIPTS_DIR))
+    from publish_daemon import PublishDaemon, WarmGenerator
+    
+    generator = WarmGenerator()
+    
+    def run_cycle(forced):
+        result = publish_blog(change_sets, scan, force or forced, generator)
+        print(f"Cycle finished with status {result}, waiting for the next trigger.")
+        return result
+    
+    daemon = PublishDaemon(run_cycle, SOCKET_FILE, interval_hours * 3600 if interval_hours else None)
+    # Publish whatever is pending right away, which also warms the generator
+    daemon.trigger()
+    try:
+        daemon.serve()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        generator.close()
+    return 0
+
+def trigger_daemon(command):
+    """
+    Ask a running daemon to publish now, or for its status
+    
+    Args:
+        command: "publish", "force" or "status"
+        
+    Returns:
+        0 if the daemon answered, non-zero otherwise
+    """
+    from publish_daemon import send_command
+    
+    socket_path = os.path.join(os.path.dirname(SCRIPTS_DIR), SOCKET_FILE)
+    reply = send_command(socket_path, command)
+    if reply is None:
+        print(f"Error: No publish daemon is listening on {socket_path}. Start one with --daemon.")
+        return 1
+    if "error" in reply:
+        print(f"Error: {reply['error']}")
+        return 1
+    if command == "status":
+        print(json.dumps(reply, indent=2))
+    elif reply["running"]:
+        print("Publish queued, it runs after the current cycle.")
+    else:
+        print("Publish queued.")
+    return 0
+
+def report_mode(runs, factor):
+    """
+    Print percentiles, trends and regressions over the last runs of the history
+    
+    Args:
+        runs: Number of most recent runs to summarize
+        factor: Flag runs slower than factor times the median of the runs before them
+        
+    Returns:
+        0 if the report was printed, non-zero otherwise
+    """
+    if runs <= 0 or factor <= 1:
+        print("Error: --report needs a positive number of runs and --threshold a factor above 1")
+        return 1
+    history_path = os.path.join(os.path.dirname(SCRIPTS_DIR), HISTORY_FILE)
+    print(render_report(load_records(history_path, runs), factor))
+    return 0
+
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Blog publishing automation script")
@@ -132,17 +665,48 @@ def main():
     group.add_argument("--once", action="store_true", help="Run the publish operation once and exit")
     group.add_argument("--schedule", type=float, metavar="HOURS", 
                       help="Run in schedule mode, publishing every HOURS hours")
+    group.add_argument("--daemon", type=float, nargs="?", const=0, metavar="HOURS",
+                       help="Run as a resident daemon that keeps the generator loaded and publishes when triggered "
+                            "through --trigger, and every HOURS hours if given")
+    group.add_argument("--trigger", nargs="?", const="publish", choices=["publish", "status"],
+                       help="Ask the running daemon to publish now (with --force: even if the inputs are unchanged), "
+                            "or print its status")
+    group.add_argument("--report", type=int, nargs="?", const=REPORT_RUNS, metavar="RUNS",
+                       help=f"Print percentiles, trends and regressions over the last RUNS runs "
+                            f"(default: {REPORT_RUNS}) recorded in {HISTORY_FILE}")
+    parser.add_argument("--changes", action="append", default=[], metavar="FILE",
+                        help="Also stage the paths of a change set, e.g. from github_auto_publisher.py --changes "
+                             "(can be repeated)")
+    parser.add_argument("--force", action="store_true",
+                        help="Run the generator and git steps even when the inputs are unchanged since the last cycle")
+    parser.add_argument("--scan", action="store_true",
+                        help="Stage every change in the working tree (git status + git add .) "
+                             "instead of only the reported change sets")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_FACTOR, metavar="FACTOR",
+                        help="With --report, flag runs slower than FACTOR times the median of the runs "
+                             "before them (default: %(default)s)")
     args = parser.parse_args()
+    # publish_blog() changes into the script directory
+    args.changes = [os.path.abspath(path) for path in args.changes]
     
     # Handle different execution modes
+    if args.report is not None:
+        return report_mode(args.report, args.threshold)
+    if args.trigger:
+        return trigger_daemon("force" if args.trigger == "publish" and args.force else args.trigger)
+    if args.daemon is not None:
+        if args.daemon < 0:
+            print("Error: Daemon interval must not be negative")
+            return 1
+        return daemon_mode(args.daemon or None, args.changes, args.scan, args.force)
     if args.schedule:
         if args.schedule <= 0:
             print("Error: Schedule interval must be greater than 0")
             return 1
-        schedule_mode(args.schedule)
+        schedule_mode(args.schedule, args.changes, args.scan, args.force)
     else:
         # Default is to run once (same as --once)
-        return publish_blog()
+        return publish_blog(args.changes, args.scan, args.force)
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
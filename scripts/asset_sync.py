@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Incremental asset sync for github_auto_publisher.py.
+A file is skipped when the destination has the same size and mtime as the
+source (copies keep the source mtime), or, failing that, the same SHA-256.
+Changed files are reflinked, hardlinked or copied into a temporary file and
+renamed into place. Files removed upstream are deleted from the destination:
+everything inside a synced directory is mirrored, and top-level files are
+tracked in a manifest so files owned by the target repository are kept.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+
+# Chunk size used when hashing files
+HASH_CHUNK_SIZE = 1 << 20
+# Linux ioctl cloning a file's extents (copy-on-write reflink)
+FICLONE = 0x40049409
+# Link modes, each falls back to the next one
+LINK_MODES = ("hardlink", "reflink", "copy")
+
+def is_ignored(name):
+    """Check whether a file or directory is never synced"""
+    return name.startswith(".git") or name.endswith(".gitkeep")
+
+def file_sha256(path):
+    """Return the SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def list_files(root):
+    """Return the relative paths of all synced files below root"""
+    files = []
+    for dir_path, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not is_ignored(d))
+        for name in sorted(names):
+            if not is_ignored(name):
+                files.append(os.path.relpath(os.path.join(dir_path, name), root))
+    return files
+
+def reflink(src_path, dst_path):
+    """Create dst_path as a copy-on-write clone of src_path, raises OSError if unsupported"""
+    import fcntl
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+def place_file(src_path, dst_path, link_mode):
+    """Put a copy of src_path at dst_path through a temporary file, returns the method used"""
+    tmp_path = os.path.join(os.path.dirname(dst_path), "." + os.path.basename(dst_path) + ".sync.tmp")
+    if os.path.lexists(tmp_path):
+        os.unlink(tmp_path)
+
+    method = "copy"
+    for mode in LINK_MODES[LINK_MODES.index(link_mode):]:
+        try:
+            if mode == "hardlink":
+                os.link(src_path, tmp_path)
+            elif mode == "reflink":
+                reflink(src_path, tmp_path)
+                shutil.copystat(src_path, tmp_path)
+            else:
+                shutil.copy2(src_path, tmp_path)
+            method = mode
+            break
+        except (OSError, ImportError):
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+            if mode == "copy":
+                raise
+    os.replace(tmp_path, dst_path)
+    return method
+
+class SyncStats:
+    def __init__(self):
+        """Initialize counters of copied, skipped and deleted files"""
+        self.copied_paths = []
+        # Copied paths that did not exist before
+        self.created_paths = []
+        self.deleted_paths = []
+        self.methods = {}
+        self.bytes_copied = 0
+        self.skipped = 0
+        self.bytes_skipped = 0
+
+    def summary(self):
+        """Return a one-line summary of the counters"""
+        methods = ", ".join("{} {}".format(count, method) for method, count in sorted(self.methods.items()))
+        return "{} copied ({:.1f}KB{}), {} skipped ({:.1f}KB), {} deleted".format(
+            len(self.copied_paths), self.bytes_copied / 1024, ": " + methods if methods else "",
+            self.skipped, self.bytes_skipped / 1024, len(self.deleted_paths))
+
+def sync_tree(source_dir, target_dir, manifest_path, link_mode="reflink"):
+    """Make target_dir hold the synced files of source_dir, returns SyncStats"""
+    stats = SyncStats()
+    target_dir = os.path.normpath(target_dir)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = set(json.load(f).get("files", []))
+    except (OSError, ValueError):
+        previous = set()
+
+    source_files = list_files(source_dir)
+    for rel_path in source_files:
+        src_path = os.path.join(source_dir, rel_path)
+        dst_path = os.path.join(target_dir, rel_path)
+        src_stat = os.stat(src_path)
+
+        if os.path.exists(dst_path):
+            dst_stat = os.stat(dst_path)
+            same = os.path.samestat(src_stat, dst_stat) or (
+                dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime_ns == src_stat.st_mtime_ns)
+            if not same and dst_stat.st_size == src_stat.st_size:
+                same = file_sha256(src_path) == file_sha256(dst_path)
+                if same:
+                    # Only the mtime differs, align it so the next run skips the hash
+                    os.utime(dst_path, ns=(dst_stat.st_atime_ns, src_stat.st_mtime_ns))
+            if same:
+                stats.skipped += 1
+                stats.bytes_skipped += src_stat.st_size
+                continue
+
+        if not os.path.exists(dst_path):
+            stats.created_paths.append(dst_path)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        method = place_file(src_path, dst_path, link_mode)
+        stats.methods[method] = stats.methods.get(method, 0) + 1
+        stats.copied_paths.append(dst_path)
+        stats.bytes_copied += src_stat.st_size
+
+    # Mirror synced directories completely, and top-level files synced by an earlier run
+    current = set(source_files)
+    synced_dirs = {rel_path.split(os.sep, 1)[0] for rel_path in source_files if os.sep in rel_path}
+    stale = {rel_path for rel_path in previous if rel_path not in current}
+    for top in synced_dirs:
+        stale.update(os.path.join(top, rel_path) for rel_path in list_files(os.path.join(target_dir, top))
+                     if os.path.join(top, rel_path) not in current)
+    for rel_path in sorted(stale):
+        dst_path = os.path.join(target_dir, rel_path)
+        if os.path.lexists(dst_path):
+            os.unlink(dst_path)
+            stats.deleted_paths.append(dst_path)
+        # Remove directories left empty
+        parent = os.path.dirname(dst_path)
+        while parent != target_dir and os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source_dir, "files": source_files}, f, indent=2)
+    return stats
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for generate_index_files.py.
+Generates synthetic content/pull_request/<repo>/<YYYY-MM>/pr_<n>_<lang>_<date>.md
+trees with Basic Information blocks, labels, translations and .patch siblings,
+times every generator phase on each tree and writes the results to JSON so
+scaling curves and regressions can be compared across commits.
+
+Usage: python3 scripts/bench_generator.py [--sizes 1000,10000,100000] [--output FILE]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+import generate_index_files as generator
+from file_output import OutputStats
+from pr_corpus import PRCorpusIndex, is_month_dir
+from pr_store import PRMetadataStore
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Label pool modelled on the Bevy archive, prefixes as used upstream
+LABELS = [
+    "A-ECS", "A-Rendering", "A-UI", "A-Assets", "A-Animation", "A-Audio", "A-Input",
+    "A-Reflection", "A-Scenes", "A-Text", "A-Windowing", "A-Build-System", "A-Diagnostics",
+    "C-Bug", "C-Feature", "C-Usability", "C-Performance", "C-Docs", "C-Code-Quality",
+    "D-Trivial", "D-Straightforward", "D-Modest", "D-Complex",
+    "S-Ready-For-Final-Review", "S-Needs-Review", "M-Needs-Migration-Guide",
+]
+AUTHORS = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi"]
+WORDS = ("the system query entity component render pipeline asset shader schedule "
+         "resource plugin world event camera mesh material texture window input").split()
+
+# Share of PRs that also have a Chinese translation
+TRANSLATED_RATIO = 0.8
+# PRs per month directory, roughly the size of a busy month upstream
+PRS_PER_MONTH = 100
+
+def sentence(rng, words=12):
+    """Return a random sentence"""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def render_document(rng, pr_number, language, date, title, labels, body_size):
+    """Render a PR document without front matter, as produced by the translation pipeline"""
+    lines = [
+        f"# {title}" if language != "en" else f"# Title: {title}",
+        "",
+        "## Basic Information",
+        f"- **Title**: {title}",
+        f"- **PR Link**: https://github.com/bevyengine/bevy/pull/{pr_number}",
+        f"- **Author**: {rng.choice(AUTHORS)}",
+        "- **Status**: MERGED",
+        "- **Labels**: " + (", ".join(labels) if labels else "None"),
+        f"- **Created**: {date[:4]}-{date[4:6]}-{date[6:8]}T08:00:00Z",
+        f"- **Merged**: {date[:4]}-{date[4:6]}-{date[6:8]}T16:00:00Z",
+        f"- **Merged By**: {rng.choice(AUTHORS)}",
+        "",
+        "## Description Translation",
+        sentence(rng),
+        "",
+        "## The Story of This Pull Request",
+        "",
+    ]
+    text = "\n".join(lines)
+    paragraphs = []
+    size = len(text)
+    while size < body_size:
+        paragraph = " ".join(sentence(rng) for _ in range(4))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return text + "\n" + "\n\n".join(paragraphs) + "\n"
+
+def render_patch(rng, pr_number, patch_size):
+    """Render a unified diff of roughly patch_size bytes"""
+    lines = [f"diff --git a/crates/bevy_ecs/src/pr_{pr_number}.rs b/crates/bevy_ecs/src/pr_{pr_number}.rs",
+             "--- a/crates/bevy_ecs/src/lib.rs", "+++ b/crates/bevy_ecs/src/lib.rs", "@@ -1,8 +1,9 @@"]
+    size = sum(len(line) + 1 for line in lines)
+    while size < patch_size:
+        line = rng.choice("+- ") + " ".join(rng.choice(WORDS) for _ in range(8))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+def generate_corpus(content_dir, file_count, seed=0, body_size=4096, patch_size=4096):
+    """Write a synthetic corpus of file_count PR documents, returns (PRs, months, bytes)"""
+    rng = random.Random(seed)
+    repo_dir = os.path.join(content_dir, "bevy")
+    written = 0
+    total_bytes = 0
+    pr_count = 0
+    months = set()
+
+    while written < file_count:
+        pr_number = 10000 + pr_count
+        month_index = pr_count // PRS_PER_MONTH
+        year, month = 2020 + month_index // 12, month_index % 12 + 1
+        date = f"{year:04d}{month:02d}{rng.randint(1, 28):02d}"
+        month_dir = os.path.join(repo_dir, f"{year:04d}-{month:02d}")
+        if month_dir not in months:
+            os.makedirs(month_dir, exist_ok=True)
+            months.add(month_dir)
+
+        title = sentence(rng, rng.randint(4, 10)).rstrip(".")
+        labels = rng.sample(LABELS, rng.randint(0, 4))
+        languages = ["en"]
+        if rng.random() < TRANSLATED_RATIO:
+            languages.append("zh-cn")
+
+        for language in languages[:file_count - written]:
+            document = render_document(rng, pr_number, language, date, title, labels, body_size)
+            path = os.path.join(month_dir, f"pr_{pr_number}_{language}_{date}.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(document)
+            total_bytes += len(document.encode("utf-8"))
+            written += 1
+
+        patch = render_patch(rng, pr_number, patch_size)
+        with open(os.path.join(month_dir, f"pr_{pr_number}.patch"), "w", encoding="utf-8") as f:
+            f.write(patch)
+        total_bytes += len(patch)
+        pr_count += 1
+
+    return pr_count, len(months), total_bytes
+
+def timed(phases, name, func, *args, **kwargs):
+    """Run func with its output suppressed and record its wall time under name"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    phases[name] = round(time.perf_counter() - start, 4)
+    return result
+
+def collect_all_section_labels(index, store, stats):
+    """Refresh the label rollups of every month directory"""
+    for dir_path in index.subdirs:
+        if is_month_dir(dir_path):
+            generator.collect_section_labels(dir_path, index, store, stats)
+
+def pair_languages(index):
+    """Resolve the language versions of every file"""
+    for pr_file in index.files.values():
+        index.language_versions(pr_file)
+
+def benchmark_tree(content_dir, store_path, jobs):
+    """Time each generator phase on a corpus, first as a full run, then as a no-op incremental run"""
+    phases = {}
+    stats = OutputStats()
+
+    store = PRMetadataStore(store_path, {"filtered_labels": generator.FILTERED_LABELS})
+    store.load()
+
+    index = timed(phases, "scan", PRCorpusIndex(content_dir).scan)
+    timed(phases, "language_pairing", pair_languages, index)
+    timed(phases, "process_markdown_files", generator.process_markdown_files,
+          index, store, stats, full=True, jobs=jobs)
+    timed(phases, "process_attachments", generator.process_attachments, index, store, stats, full=True)
+    # Directory structure alone, label rollups are timed separately below
+    timed(phases, "process_directory", generator.process_directory,
+          content_dir, index, store, stats, label_dirs=set())
+    timed(phases, "collect_section_labels", collect_all_section_labels, index, store, stats)
+    timed(phases, "store_save", store.save)
+    store.close()
+
+    store = PRMetadataStore(store_path, {"filtered_labels": generator.FILTERED_LABELS})
+    store.load()
+    timed(phases, "incremental_noop", generator.generate_index, content_dir, store, jobs=jobs)
+    store.close()
+
+    phases["total_full"] = round(sum(phases[name] for name in (
+        "scan", "language_pairing", "process_markdown_files", "process_attachments", "process_directory",
+        "collect_section_labels", "store_save")), 4)
+    return phases, stats
+
+def git_commit():
+    """Return the current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_index_files.py on synthetic corpora")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated numbers of Markdown files (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="Worker processes for front matter rewrites (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic corpus")
+    parser.add_argument("--output", default="bench_generator.json", help="JSON results file (default: %(default)s)")
+    parser.add_argument("--work-dir", help="Directory for the synthetic trees (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic trees after the run")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bench_generator_")
+    results = []
+
+    try:
+        for size in sizes:
+            tree_dir = os.path.join(work_dir, f"corpus_{size}")
+            shutil.rmtree(tree_dir, ignore_errors=True)
+            content_dir = os.path.join(tree_dir, "content", "pull_request")
+            os.makedirs(content_dir)
+
+            print(f"Generating {size} files...")
+            pr_count, month_count, total_bytes = generate_corpus(content_dir, size, seed=args.seed)
+
+            print(f"Running generator on {size} files...")
+            phases, stats = benchmark_tree(content_dir, os.path.join(tree_dir, "pr_metadata.sqlite3"), args.jobs)
+            results.append({
+                "files": size,
+                "prs": pr_count,
+                "months": month_count,
+                "bytes": total_bytes,
+                "output_files": stats.written,
+                "phases": phases,
+            })
+            for name, seconds in phases.items():
+                print(f"  {name:<24} {seconds:9.3f} s")
+
+            if not args.keep:
+                shutil.rmtree(tree_dir)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": args.jobs,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
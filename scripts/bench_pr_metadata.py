@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for PR metadata extraction.
+Compares the per-file cost of the previous regex scans (full document, one
+scan per field) with the compiled header-bounded extractor in pr_metadata.py.
+Edge cases the corpus lacks are run through the generator's header read and
+must resolve like the previous scans as well.
+
+Usage: python3 scripts/bench_pr_metadata.py [content_dir] [--repeat N]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+from pr_corpus import PRFile
+from pr_metadata import extract_pr_metadata
+from generate_index_files import read_markdown_header, strip_front_matter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTENT_DIR = os.path.join(ROOT_DIR, "content", "pull_request")
+
+# (file name, content) of documents whose title lies beyond the header: a "# Title:"
+# heading after the Basic Information block still wins over its Title field
+EDGE_CASES = [
+    ("pr_1_en_20250101.md",
+     "## Basic Information\n- **Title**: Field title\n- **Labels**: `A-ECS`\n\n"
+     "## Description\nBody\n\n# Title: Heading title\n"),
+    ("pr_2_en_20250101.md",
+     "+++\ntitle = \"#2 Stale\"\n+++\n## Basic Information\n- **Title**: Field title\n\n"
+     "## Description\n# Title: Heading title\n"),
+]
+
+def legacy_extract(content, file_name):
+    """Previous extraction: every field re-scans the whole document"""
+    match = re.search(r'pr_(\d+)(?:_([a-z]{2}(?:-[a-z]{2})?))?_(\d{8})(?:_\d{6})?', file_name)
+    title = None
+    if match:
+        title_match = re.search(r'# Title: (.*?)(?:\r?\n)', content)
+        if not title_match:
+            basic_info_match = re.search(r'## Basic Information(.*?)(?:##|\Z)', content, re.DOTALL)
+            if basic_info_match:
+                title_match = re.search(r'\*\*Title\*\*: (.*?)(?:\r?\n)', basic_info_match.group(1))
+        if not title_match:
+            title_match = re.search(r'\*\*标题\*\*:\s*`?(.*?)`?(?:\r?\n|\*\*)', content)
+        if title_match:
+            title = title_match.group(1).strip()
+
+    labels = []
+    basic_info_match = re.search(r'## Basic Information(.*?)(?:##|\Z)', content, re.DOTALL)
+    if basic_info_match:
+        labels_match = re.search(r'\*\*Labels\*\*:\s*(.*?)(?:\r?\n|$)', basic_info_match.group(1))
+        if labels_match:
+            labels_str = labels_match.group(1).strip()
+            if labels_str.lower() != "none" and labels_str:
+                labels = [label.strip().replace('`', '') for label in labels_str.split(',')]
+    return title, labels
+
+def compiled_extract(content, file_name):
+    """Current extraction through pr_metadata"""
+    record = extract_pr_metadata(content, file_name)
+    return (record.title if record.pr_number else None), record.labels
+
+def edge_case_mismatches():
+    """Return the edge cases the generator's header read resolves differently from the previous scans"""
+    mismatches = []
+    with tempfile.TemporaryDirectory() as content_dir:
+        for file_name, content in EDGE_CASES:
+            path = os.path.join(content_dir, file_name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            header = read_markdown_header(PRFile(content_dir, content_dir, file_name, os.stat(path)))
+            if compiled_extract(strip_front_matter(header.text), file_name) != \
+                    legacy_extract(strip_front_matter(content), file_name):
+                mismatches.append(file_name)
+    return mismatches
+
+def load_corpus(content_dir):
+    """Load every PR markdown document into memory"""
+    documents = []
+    for root, _, files in os.walk(content_dir):
+        for file_name in sorted(files):
+            if file_name.endswith(".md") and file_name != "_index.md":
+                with open(os.path.join(root, file_name), "r", encoding="utf-8") as f:
+                    documents.append((file_name, f.read()))
+    return documents
+
+def time_per_file(extract, documents, repeat):
+    """Return the best-of-repeat per-file cost in microseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for file_name, content in documents:
+            extract(content, file_name)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / max(len(documents), 1) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PR metadata extraction")
+    parser.add_argument("content_dir", nargs="?", default=CONTENT_DIR)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions, best is reported")
+    args = parser.parse_args()
+
+    documents = load_corpus(args.content_dir)
+    if not documents:
+        print(f"No PR documents found in {args.content_dir}")
+        return 1
+
+    mismatches = [name for name, content in documents
+                  if legacy_extract(content, name) != compiled_extract(content, name)]
+    mismatches += edge_case_mismatches()
+
+    legacy = time_per_file(legacy_extract, documents, args.repeat)
+    compiled = time_per_file(compiled_extract, documents, args.repeat)
+
+    print(f"Documents:  {len(documents)} (+{len(EDGE_CASES)} edge cases)")
+    print(f"Before:     {legacy:.1f} us/file")
+    print(f"After:      {compiled:.1f} us/file")
+    print(f"Speedup:    {legacy / compiled:.2f}x")
+    print(f"Mismatches: {len(mismatches)}")
+    for name in mismatches[:10]:
+        print(f"  {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for published WASM artifacts.
+Every unique module and glue script is stored once as <hash><ext> in a
+directory under static/, however many projects publish it. Projects refer to
+blobs by URL through their wasm_manifest.json, and blobs no manifest refers
+to are garbage-collected after a publish.
+"""
+
+import os
+import json
+import hashlib
+
+from file_output import atomic_write
+from wasm_fingerprint import HASH_LENGTH, MANIFEST_NAME
+
+class BlobStore:
+    def __init__(self, store_dir, url_prefix):
+        """Initialize a store in store_dir, served below url_prefix"""
+        self.store_dir = store_dir
+        self.url_prefix = url_prefix.rstrip("/") + "/"
+        self.stored = 0
+        self.bytes_stored = 0
+        self.reused = 0
+        self.bytes_reused = 0
+
+    def blob_name(self, data, ext):
+        """Return the store file name of data"""
+        return hashlib.sha256(data).hexdigest()[:HASH_LENGTH] + ext
+
+    def url(self, blob_name):
+        """Return the URL a blob is served from"""
+        return self.url_prefix + blob_name
+
+    def put(self, data, ext):
+        """Store data unless an identical blob exists, returns True if it was written"""
+        blob_path = os.path.join(self.store_dir, self.blob_name(data, ext))
+        if os.path.exists(blob_path) and os.path.getsize(blob_path) == len(data):
+            self.reused += 1
+            self.bytes_reused += len(data)
+            return False
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        atomic_write(blob_path, data)
+        self.stored += 1
+        self.bytes_stored += len(data)
+        return True
+
+    def referenced(self, projects_dir):
+        """Return the blob names referenced by the manifests of all projects"""
+        names = set()
+        for project in sorted(os.listdir(projects_dir)) if os.path.isdir(projects_dir) else []:
+            try:
+                with open(os.path.join(projects_dir, project, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            names.update(url[len(self.url_prefix):] for url in manifest.values()
+                         if url.startswith(self.url_prefix))
+        return names
+
+    def collect_garbage(self, projects_dir):
+        """Delete blobs no project refers to, returns their paths"""
+        if not os.path.isdir(self.store_dir):
+            return []
+        referenced = self.referenced(projects_dir)
+        removed = []
+        for blob_name in sorted(os.listdir(self.store_dir)):
+            if blob_name not in referenced and not blob_name.startswith("."):
+                os.unlink(os.path.join(self.store_dir, blob_name))
+                removed.append(os.path.join(self.store_dir, blob_name))
+        return removed
+
+    def summary(self):
+        """Return a one-line summary of the counters"""
+        return "{} blobs stored ({:.1f}KB), {} reused ({:.1f}KB deduplicated)".format(
+            self.stored, self.bytes_stored / 1024, self.reused, self.bytes_reused / 1024)
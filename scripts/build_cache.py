@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of WASM build artifacts for github_auto_publisher.py.
+A binary's cache key is a SHA-256 over everything its build reads: the
+binary's source directory, shared crate sources, Cargo.toml, Cargo.lock, the
+build script if the build runs one, and the toolchain version and build settings. Artifacts are stored under
+<cache_dir>/<name>/<key>/ and restored instead of running the build.
+"""
+
+import os
+import shutil
+import hashlib
+import threading
+import subprocess
+
+# Directories never hashed as build inputs
+IGNORED_DIRS = {"target", "output", "node_modules"}
+
+# Files every cached build must provide
+REQUIRED_ARTIFACTS = ["app.js", "app.d.ts", "{name}_bg.wasm"]
+OPTIONAL_ARTIFACTS = ["{name}_bg.wasm.d.ts"]
+
+# Cache entries kept per binary, older ones are removed when a new one is stored
+MAX_ENTRIES = 3
+
+def artifact_names(binary_name, optional=True):
+    """Return the artifact file names of a binary"""
+    names = REQUIRED_ARTIFACTS + (OPTIONAL_ARTIFACTS if optional else [])
+    return [name.format(name=binary_name) for name in names]
+
+def toolchain_version(commands=(("rustc", "--version", "--verbose"), ("wasm-bindgen", "--version"))):
+    """Return the version output of the build toolchain, tools that are not installed are noted as such"""
+    versions = []
+    for command in commands:
+        try:
+            output = subprocess.run(list(command), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    timeout=30).stdout.decode("utf-8", "replace").strip()
+        except (OSError, subprocess.TimeoutExpired):
+            output = "not installed"
+        versions.append("{}: {}".format(command[0], output))
+    return "\n".join(versions)
+
+def hash_path(digest, root, rel_path):
+    """Feed a file or a directory tree below root into digest, in a stable order"""
+    path = os.path.join(root, rel_path)
+    if os.path.isfile(path):
+        digest.update(b"file\0" + rel_path.replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        return
+
+    if not os.path.isdir(path):
+        digest.update(b"missing\0" + rel_path.replace(os.sep, "/").encode("utf-8") + b"\0")
+        return
+
+    for dir_path, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in IGNORED_DIRS)
+        for file_name in sorted(files):
+            if file_name.startswith("."):
+                continue
+            hash_path(digest, root, os.path.relpath(os.path.join(dir_path, file_name), root))
+
+class BuildCache:
+    def __init__(self, cache_dir, source_repo, shared_paths, build_script, toolchain, max_entries=MAX_ENTRIES):
+        """Initialize a cache for builds of one source repository"""
+        self.cache_dir = cache_dir
+        self.source_repo = source_repo
+        self.shared_paths = shared_paths
+        self.build_script = build_script
+        self.toolchain = toolchain
+        self.max_entries = max_entries
+        # Builds run on worker threads
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    def key(self, binary_name, binary_path):
+        """Return the cache key of a binary"""
+        digest = hashlib.sha256()
+        digest.update("name: {}\ntoolchain: {}\n".format(binary_name, self.toolchain).encode("utf-8"))
+
+        # The directory holding the binary's entry point, e.g. app/<name>/
+        inputs = [os.path.dirname(binary_path) or binary_path]
+        inputs += list(self.shared_paths)
+        inputs += ["Cargo.toml", "Cargo.lock"]
+        if self.build_script:
+            inputs.append(self.build_script)
+        for rel_path in inputs:
+            hash_path(digest, self.source_repo, os.path.normpath(rel_path))
+        return digest.hexdigest()
+
+    def entry_dir(self, binary_name, key):
+        """Return the directory holding the artifacts of a key"""
+        return os.path.join(self.cache_dir, binary_name, key)
+
+    def restore(self, binary_name, key, output_dir):
+        """Copy cached artifacts into output_dir, returns False on a cache miss"""
+        entry_dir = self.entry_dir(binary_name, key)
+        if not all(os.path.exists(os.path.join(entry_dir, name)) for name in artifact_names(binary_name, False)):
+            with self.lock:
+                self.misses += 1
+            return False
+
+        os.makedirs(output_dir, exist_ok=True)
+        for name in artifact_names(binary_name):
+            cached_path = os.path.join(entry_dir, name)
+            if os.path.exists(cached_path):
+                shutil.copy2(cached_path, os.path.join(output_dir, name))
+        # Mark the entry as recently used
+        os.utime(entry_dir)
+        with self.lock:
+            self.hits += 1
+        return True
+
+    def store(self, binary_name, key, output_dir):
+        """Store the artifacts of a finished build, returns False if any required artifact is missing"""
+        if not all(os.path.exists(os.path.join(output_dir, name)) for name in artifact_names(binary_name, False)):
+            return False
+
+        entry_dir = self.entry_dir(binary_name, key)
+        tmp_dir = entry_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in artifact_names(binary_name):
+            output_path = os.path.join(output_dir, name)
+            if os.path.exists(output_path):
+                shutil.copy2(output_path, os.path.join(tmp_dir, name))
+
+        # Publish the entry with a rename, so a reader never sees a partial entry
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.rename(tmp_dir, entry_dir)
+        self.prune(binary_name)
+        with self.lock:
+            self.stored += 1
+        return True
+
+    def prune(self, binary_name):
+        """Remove all but the most recently used entries of a binary"""
+        binary_dir = os.path.join(self.cache_dir, binary_name)
+        entries = [os.path.join(binary_dir, key) for key in os.listdir(binary_dir) if not key.endswith(".tmp")]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for entry_dir in entries[self.max_entries:]:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def summary(self):
+        """Return a one-line summary of the counters"""
+        return "{} hits, {} misses, {} stored".format(self.hits, self.misses, self.stored)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Subprocess runner for WASM builds in github_auto_publisher.py.
+Output is streamed line by line into a log file on a reader thread, so a
+chatty build can never fill a pipe, and completion is detected the moment
+the process exits. The last lines are kept for failure summaries. On timeout
+the whole process group is terminated, then killed after a grace period.
+Children that outlive the build and keep its output open, such as an
+sccache server started by cargo, cannot stall the run either: the reader
+is given a few seconds to drain the pipe, then the rest of the process
+group is terminated and the reader abandoned.
+"""
+
+import os
+import time
+import signal
+import threading
+import subprocess
+from collections import deque, namedtuple
+
+# Lines kept for failure summaries
+TAIL_LINES = 20
+# Minimum seconds between two progress callbacks
+PROGRESS_INTERVAL = 5.0
+# Seconds between SIGTERM and SIGKILL on timeout
+KILL_GRACE = 10.0
+# Seconds the reader may take to drain the output after the process exited
+DRAIN_TIMEOUT = 5.0
+
+# returncode is None when the process timed out; tail holds the last output lines
+RunResult = namedtuple("RunResult", ["returncode", "timed_out", "duration", "lines", "tail"])
+
+def signal_group(process, sig):
+    """Send a signal to the process group of a process started in its own session"""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def stop_process(process, grace=KILL_GRACE):
+    """Terminate a process and its children, escalating to a kill after grace seconds"""
+    signal_group(process, signal.SIGTERM)
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+        process.wait()
+
+def run_logged(command, cwd, log_path, timeout, on_progress=None, tail_lines=TAIL_LINES,
+               progress_interval=PROGRESS_INTERVAL, env=None):
+    """Run a command, streaming its combined output into log_path
+
+    on_progress(line_count, last_line) is called from the reader thread at most
+    once per progress_interval seconds while output arrives.
+    """
+    start = time.time()
+    tail = deque(maxlen=tail_lines)
+    # detached is set once the reader is abandoned, it must not touch the closed log file then
+    state = {"lines": 0, "last_progress": start, "detached": False}
+
+    with open(log_path, "w", encoding="utf-8") as log_file:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            # Own process group, so a timeout also stops cargo and other children
+            start_new_session=True
+        )
+
+        def read_output():
+            try:
+                for line in process.stdout:
+                    if state["detached"]:
+                        break
+                    log_file.write(line)
+                    log_file.flush()
+                    line = line.rstrip()
+                    tail.append(line)
+                    state["lines"] += 1
+                    now = time.time()
+                    if on_progress is not None and now - state["last_progress"] >= progress_interval:
+                        state["last_progress"] = now
+                        on_progress(state["lines"], line)
+            except ValueError:
+                # The log file was closed after the reader was abandoned
+                return
+            process.stdout.close()
+
+        reader = threading.Thread(target=read_output, daemon=True)
+        reader.start()
+
+        timed_out = False
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            stop_process(process)
+
+        # Leftover children of the build may still hold the pipe open
+        reader.join(timeout=DRAIN_TIMEOUT)
+        if reader.is_alive():
+            signal_group(process, signal.SIGTERM)
+            reader.join(timeout=DRAIN_TIMEOUT)
+        if reader.is_alive():
+            state["detached"] = True
+
+    return RunResult(
+        returncode=None if timed_out else process.returncode,
+        timed_out=timed_out,
+        duration=time.time() - start,
+        lines=state["lines"],
+        tail=list(tail)
+    )
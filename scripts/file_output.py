@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Shared output layer for the site generation scripts.
+Rendered bytes are compared with what is on disk and unchanged files are not
+touched, which keeps `zola serve` rebuilds, `git status` and commits limited
+to real changes. Files are written to a temporary file next to the target
+and atomically renamed over it, so an interrupted run never leaves a
+truncated file behind. Created, modified and deleted paths are collected
+into a change set, which publish.py stages instead of scanning the tree.
+Change sets are merged into a pending changes file that is kept until
+publish.py pushes them, so runs outside of publish.py (the command line,
+--watch) cannot use up a change before it is published.
+"""
+
+import os
+import json
+import fcntl
+import shutil
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+# Chunk size used when streaming an unchanged body into the new file
+COPY_CHUNK_SIZE = 1 << 16
+# Permissions of newly created files (temporary files start out as 0600)
+NEW_FILE_MODE = 0o644
+
+def _temp_file_for(file_path):
+    """Create a hidden temporary file in the directory of file_path"""
+    return tempfile.mkstemp(dir=os.path.dirname(file_path) or ".",
+                            prefix="." + os.path.basename(file_path) + ".",
+                            suffix=".tmp")
+
+def atomic_rewrite(file_path, head, body_offset):
+    """Replace everything before body_offset in a file with head
+
+    The body is streamed from the old file into the temporary file in one pass
+    and never held in memory. Returns the SHA-256 digest of the new content.
+    """
+    digest = hashlib.sha256(head)
+    fd, tmp_path = _temp_file_for(file_path)
+    try:
+        with os.fdopen(fd, "wb") as dst, open(file_path, "rb") as src:
+            dst.write(head)
+            src.seek(body_offset)
+            for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                dst.write(chunk)
+                digest.update(chunk)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return digest.hexdigest()
+
+def atomic_write(file_path, data):
+    """Atomically replace a file with data"""
+    fd, tmp_path = _temp_file_for(file_path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        else:
+            os.chmod(tmp_path, NEW_FILE_MODE)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def files_equal(path_a, path_b):
+    """Compare two files by size first, then by content"""
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, "rb") as a, open(path_b, "rb") as b:
+        while True:
+            chunk_a = a.read(COPY_CHUNK_SIZE)
+            if chunk_a != b.read(COPY_CHUNK_SIZE):
+                return False
+            if not chunk_a:
+                return True
+
+class OutputStats:
+    def __init__(self):
+        """Initialize counters of written and unchanged files"""
+        self.written_paths = []
+        self.unchanged = 0
+        # Path -> "created", "modified" or "deleted"
+        self.changes = {}
+
+    @property
+    def written(self):
+        """Number of files written"""
+        return len(self.written_paths)
+
+    def record(self, file_path, written, created=False):
+        """Count a file as written or unchanged"""
+        if written:
+            self.written_paths.append(file_path)
+            self.note_change(file_path, "created" if created else "modified")
+        else:
+            self.unchanged += 1
+
+    def note_change(self, file_path, kind):
+        """Add a path to the change set, a path created in this run stays created"""
+        if kind == "modified" and self.changes.get(file_path) == "created":
+            return
+        self.changes[file_path] = kind
+
+    def change_set(self, root):
+        """Return the changed paths relative to root, grouped by kind"""
+        change_set = {"root": root, "created": [], "modified": [], "deleted": []}
+        for file_path, kind in self.changes.items():
+            change_set[kind].append(os.path.relpath(file_path, root).replace(os.sep, "/"))
+        for kind in ("created", "modified", "deleted"):
+            change_set[kind].sort()
+        return change_set
+
+    def summary(self):
+        """Return a one-line summary of the counters"""
+        return "{} written, {} unchanged".format(self.written, self.unchanged)
+
+def file_matches(file_path, content):
+    """Check whether a file on disk holds exactly the given content"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        if os.path.getsize(file_path) != len(data):
+            return False
+        with open(file_path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+def write_if_changed(file_path, content, stats=None):
+    """Write content only when it differs from the file on disk, returns True if written"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+
+    changed = not file_matches(file_path, data)
+    created = changed and not os.path.exists(file_path)
+    if changed:
+        atomic_write(file_path, data)
+    if stats is not None:
+        stats.record(file_path, changed, created)
+    return changed
+
+def copy_if_changed(src_path, dst_path, stats=None):
+    """Copy a file only when the destination differs, returns True if copied"""
+    created = not os.path.exists(dst_path)
+    changed = created or not files_equal(src_path, dst_path)
+    if changed:
+        shutil.copy2(src_path, dst_path)
+    if stats is not None:
+        stats.record(dst_path, changed, created)
+    return changed
+
+def write_change_set(change_set_path, change_set):
+    """Write a change set as JSON"""
+    os.makedirs(os.path.dirname(os.path.abspath(change_set_path)), exist_ok=True)
+    atomic_write(change_set_path, (json.dumps(change_set, indent=2) + "\n").encode("utf-8"))
+
+@contextmanager
+def pending_lock(pending_path):
+    """Hold an exclusive lock on the pending changes while reading and replacing them"""
+    os.makedirs(os.path.dirname(os.path.abspath(pending_path)), exist_ok=True)
+    with open(pending_path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def read_pending_changes(pending_path):
+    """Return the pending changes (repository-relative path -> kind) and whether they are complete
+
+    Pending changes are incomplete once a run could not tell what it changed,
+    e.g. a full run; publish.py then asks git instead.
+    """
+    try:
+        with open(pending_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, True
+    return data.get("paths", {}), data.get("complete", True)
+
+def write_pending_changes(pending_path, paths, complete=True):
+    """Replace the pending changes"""
+    os.makedirs(os.path.dirname(os.path.abspath(pending_path)), exist_ok=True)
+    data = {"paths": paths, "complete": complete}
+    atomic_write(pending_path, (json.dumps(data, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+def merge_pending_changes(pending_path, change_set, repo_root):
+    """Merge a change set into the pending changes, paths outside repo_root are ignored"""
+    complete = change_set.get("complete", True)
+    if complete and not any(change_set[kind] for kind in ("created", "modified", "deleted")):
+        return
+    with pending_lock(pending_path):
+        paths, pending_complete = read_pending_changes(pending_path)
+        for kind in ("created", "modified", "deleted"):
+            for path in change_set[kind]:
+                rel_path = os.path.relpath(os.path.join(change_set["root"], path), repo_root)
+                if rel_path.startswith(".."):
+                    print(f"Ignoring change outside of the repository: {rel_path}")
+                    continue
+                paths[rel_path.replace(os.sep, "/")] = kind
+        write_pending_changes(pending_path, paths, pending_complete and complete)
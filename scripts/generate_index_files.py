@@ -2,12 +2,26 @@
 """
 Automatically generate _index.md files for content/pull_request directory and its subdirectories.
 Also adds front matter to Markdown files that don't have it.
+Other scripts import generate() and get the counts, changed paths, timings and
+errors of a run as a GenerateResult instead of parsing the command output.
 """
 
 import os
 import re
+import sys
+import time
+import cProfile
+import argparse
 from datetime import datetime
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from file_output import OutputStats, atomic_rewrite, merge_pending_changes, write_if_changed, write_change_set
+from generator_profile import PROFILER
+from index_watcher import watch
+from pr_corpus import PRCorpusIndex, is_month_dir
+from pr_metadata import FRONT_MATTER_PATTERN, TITLE_HEADING_PATTERN, extract_pr_metadata, read_pr_header
+from pr_store import PRMetadataStore
 
 # Project root directory
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -15,6 +29,12 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONTENT_DIR = os.path.join(ROOT_DIR, "content", "pull_request")
 # Configuration file
 CONFIG_FILE = os.path.join(ROOT_DIR, "config.toml")
+# Metadata store used by incremental runs and queries
+STORE_FILE = os.path.join(ROOT_DIR, ".cache", "pr_metadata.sqlite3")
+# Default path of the --profile report
+PROFILE_FILE = os.path.join(ROOT_DIR, ".cache", "generator_profile.json")
+# Changes not yet pushed, every run merges its change set in and publish.py stages them
+PENDING_FILE = os.path.join(ROOT_DIR, ".cache", "publish_pending.json")
 
 def load_filtered_labels():
     """Load filtered labels from config.toml using regex parsing"""
@@ -37,6 +57,36 @@ def load_filtered_labels():
 
 FILTERED_LABELS = load_filtered_labels()
 
+# Outcome of generate(); change_set maps created/modified/deleted to paths relative to ROOT_DIR and
+# its complete flag is False when the run cannot tell what it changed (full or failed runs),
+# timers and counters come from the profiler, errors lists what made the run fail and
+# index is the corpus index of a successful run, to be passed to the next one
+GenerateResult = namedtuple("GenerateResult", [
+    "mode", "files_scanned", "files_rewritten", "output_written", "output_unchanged",
+    "change_set", "wall_seconds", "timers", "counters", "errors", "index",
+])
+
+class GenerateOptions:
+    def __init__(self, full=False, jobs=None, store=None, store_path=STORE_FILE, changes=None, profile=None,
+                 pending=PENDING_FILE, index=None):
+        """Options of generate(), the defaults match the command line
+
+        store is an already loaded PRMetadataStore kept open across runs; without
+        one, the store at store_path is opened for this run only. changes and
+        profile are optional paths the change set and profile report are written to.
+        The change set is merged into the pending changes at pending, None skips that.
+        index is the PRCorpusIndex of an earlier run in this process: directories
+        unchanged since then are not listed again. A full run ignores it.
+        """
+        self.full = full
+        self.jobs = jobs or os.cpu_count() or 1
+        self.store = store
+        self.store_path = store_path
+        self.changes = changes
+        self.profile = profile
+        self.pending = pending
+        self.index = index
+
 def escape_toml_string(s):
     """Escape special characters in a TOML string"""
     # Replace backslashes first to avoid double escaping
@@ -58,14 +108,15 @@ def format_title(dir_name):
     # Handle regular directory names (e.g., bevy)
     return dir_name.replace("_", " ").title()
 
-def create_index_file(dir_path):
+@PROFILER.timed("create_index_file")
+def create_index_file(dir_path, stats):
     """Create _index.md file for the specified directory"""
     index_path = os.path.join(dir_path, "_index.md")
     
     # Skip if file already exists
     if os.path.exists(index_path):
         # print(f"Skipping existing file: {index_path}")
-        return
+        return False
     
     # Get directory name
     dir_name = os.path.basename(dir_path)
@@ -82,65 +133,26 @@ template = "pull_request.html"
 """
     
     # Write to file
-    with open(index_path, "w") as f:
-        f.write(content)
+    if write_if_changed(index_path, content, stats):
+        PROFILER.count("index_bytes_written", len(content.encode("utf-8")))
     
     print(f"Created: {index_path}")
+    return True
 
-def collect_section_labels(dir_path):
-    """Collect all labels from PR files in the directory and update the _index.md file"""
+@PROFILER.timed("collect_section_labels")
+def collect_section_labels(dir_path, index, store, stats):
+    """Collect all labels of PR files in the directory from the metadata store and update the _index.md file"""
     index_path = os.path.join(dir_path, "_index.md")
     
     # Skip if file doesn't exist
     if not os.path.exists(index_path):
         return
     
-    # Collect all labels from markdown files in this directory and subdirectories
-    all_labels = set()
-    
-    # Track unique PR numbers to calculate actual PR count
-    unique_prs = set()
-    
-    # Process current directory
-    for file in os.listdir(dir_path):
-        file_path = os.path.join(dir_path, file)
-        if file.endswith(".md") and file != "_index.md" and os.path.isfile(file_path):
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    labels = extract_labels(content)
-                    # Filter out unwanted labels
-                    labels = [label for label in labels if label not in FILTERED_LABELS]
-                    all_labels.update(labels)
-                    
-                    # Extract PR number from filename
-                    pr_match = re.search(r'pr_(\d+)', file)
-                    if pr_match:
-                        unique_prs.add(pr_match.group(1))
-            except Exception as e:
-                print(f"Error processing file {file_path}: {e}")
-    
-    # Process subdirectories
-    for item in os.listdir(dir_path):
-        item_path = os.path.join(dir_path, item)
-        if os.path.isdir(item_path):
-            for file in os.listdir(item_path):
-                if file.endswith(".md") and file != "_index.md":
-                    file_path = os.path.join(item_path, file)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            content = f.read()
-                            labels = extract_labels(content)
-                            # Filter out unwanted labels
-                            labels = [label for label in labels if label not in FILTERED_LABELS]
-                            all_labels.update(labels)
-                            
-                            # Extract PR number from filename
-                            pr_match = re.search(r'pr_(\d+)', file)
-                            if pr_match:
-                                unique_prs.add(pr_match.group(1))
-                    except Exception as e:
-                        print(f"Error processing file {file_path}: {e}")
+    # Collect all labels from markdown files in this directory and subdirectories,
+    # and track unique PR numbers to calculate actual PR count
+    rel_dir = os.path.relpath(dir_path, index.content_dir).replace(os.sep, '/')
+    with PROFILER.phase("store_section_summary"):
+        all_labels, unique_prs = store.section_summary(rel_dir)
     
     # Skip if no labels found
     if not all_labels and not unique_prs:
@@ -222,169 +234,81 @@ def collect_section_labels(dir_path):
     # Clean up any consecutive empty lines in the front matter
     new_front_matter = re.sub(r'\n\s*\n\s*\n', '\n\n', new_front_matter)
     
-    # Update the file
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write("+++" + new_front_matter + "\n+++\n")
-        if content_after_front_matter:
-            f.write("\n" + content_after_front_matter)
-    
-    # print(f"Updated labels and PR count in index file: {index_path}")
+    # Update the file, unless labels and PR count are already up to date
+    new_content = "+++" + new_front_matter + "\n+++\n"
+    if content_after_front_matter:
+        new_content += "\n" + content_after_front_matter
+    if write_if_changed(index_path, new_content, stats):
+        PROFILER.count("index_bytes_written", len(new_content.encode("utf-8")))
 
-def process_directory(dir_path):
-    """Process directory and its subdirectories"""
+def process_directory(dir_path, index, store, stats, label_dirs=None):
+    """Process directory and its subdirectories
+    
+    If label_dirs is given, labels are only re-collected for those directories
+    and for directories whose _index.md was just created.
+    """
     # Create _index.md for current directory
-    create_index_file(dir_path)
+    created = create_index_file(dir_path, stats)
     
-    # Process subdirectories
-    for item in os.listdir(dir_path):
-        item_path = os.path.join(dir_path, item)
-        if os.path.isdir(item_path):
-            process_directory(item_path)
+    # Process subdirectories, as listed by the corpus scan
+    for item_path in index.subdirs.get(os.path.normpath(dir_path), []):
+        process_directory(item_path, index, store, stats, label_dirs)
     
     # After processing all subdirectories, collect labels
     # Only collect labels for month-level directories (YYYY-MM format)
-    dir_name = os.path.basename(dir_path)
-    if re.match(r'\d{4}-\d{2}', dir_name):
-        collect_section_labels(dir_path)
+    if is_month_dir(dir_path):
+        if label_dirs is None or created or os.path.normpath(dir_path) in label_dirs:
+            collect_section_labels(dir_path, index, store, stats)
 
-def get_language_name(lang_code):
-    """Return the full name of a language based on its code"""
-    language_names = {
-        "en": "English",
-        "zh-cn": "中文",
-        "fr": "Français",
-        # Add more languages as needed
+def metadata_from_record(record):
+    """Derive the metadata rendered into front matter, and recorded in the store, from a PRMetadata record"""
+    # Filter out unwanted labels
+    labels = [label for label in record.labels if label not in FILTERED_LABELS]
+    if not record.pr_number:
+        return {"labels": labels}
+    
+    # Use the title extracted from content, or just the PR number
+    title = f"#{record.pr_number}"
+    if record.title is not None:
+        title = f"#{record.pr_number} {record.title}"
+    
+    return {
+        "pr_number": record.pr_number,
+        "language": record.language,
+        "date": record.date,
+        "title": title,
+        "labels": labels
     }
-    return language_names.get(lang_code, lang_code)
-
-def extract_labels(content):
-    """Extract PR labels from the Basic Information section"""
-    # Try to find the Basic Information section
-    basic_info_match = re.search(r'## Basic Information(.*?)(?:##|\Z)', content, re.DOTALL)
-    if basic_info_match:
-        basic_info_content = basic_info_match.group(1)
-        # Look for the Labels field
-        labels_match = re.search(r'\*\*Labels\*\*:\s*(.*?)(?:\r?\n|$)', basic_info_content)
-        if labels_match:
-            labels_str = labels_match.group(1).strip()
-            # Check if labels are "None" or empty
-            if labels_str.lower() == "none" or not labels_str:
-                return []
-            # Split by comma and strip whitespace
-            labels = [label.strip() for label in labels_str.split(',')]
-            # Remove backtick characters from each label
-            labels = [label.replace('`', '') for label in labels]
-            return labels
-    return []
-
-def find_language_versions(file_path, pr_number):
-    """Find all language versions of a PR and return them as a dictionary"""
-    dir_path = os.path.dirname(file_path)
-    available_languages = OrderedDict()
-    
-    # Collect all matching files first
-    matching_files = []
-    for file in os.listdir(dir_path):
-        if file.endswith(".md") and file != "_index.md":
-            # Look for PR number and language code in filename
-            # Updated to handle both formats: pr_18143_zh-cn_20250303.md and pr_18143_zh-cn_20250303_215251.md
-            match = re.search(r'pr_(\d+)(?:_([a-z]{2}(?:-[a-z]{2})?))?_', file)
-            if match and match.group(1) == pr_number:
-                matching_files.append((file, match))
-    
-    # Sort files by language code to ensure consistent order across platforms
-    matching_files.sort(key=lambda x: x[1].group(2) if x[1].group(2) else "en")
-    
-    # Process files in sorted order
-    for file, match in matching_files:
-        # Extract language code or default to "en"
-        lang_code = match.group(2) if match.group(2) else "en"
-        lang_name = get_language_name(lang_code)
-        
-        # Create relative URL for this language version
-        # Replace underscores with hyphens to match Zola's URL generation rules
-        # Do not include .html suffix as Zola generates clean URLs
-        file_name_without_ext = os.path.splitext(file)[0]
-        file_name_with_hyphens = file_name_without_ext.replace('_', '-')
-        rel_dir_path = os.path.relpath(dir_path, CONTENT_DIR)
-        url = f"/pull_request/{rel_dir_path}/{file_name_with_hyphens}"
-        url = url.replace(os.sep, '/')
-        
-        available_languages[lang_code] = {
-            "name": lang_name,
-            "url": url
-        }
-    
-    return available_languages
 
-def ensure_front_matter(md_file_path):
-    """Ensure Markdown file has front matter"""
-    with open(md_file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    
-    # Extract information from filename
-    filename = os.path.basename(md_file_path)
-    # Look for PR number, language code, and datetime in format: pr_18143_zh-cn_20250303_215251.md
-    # Updated to handle both formats: pr_18143_zh-cn_20250303.md and pr_18143_zh-cn_20250303_215251.md
-    match = re.search(r'pr_(\d+)(?:_([a-z]{2}(?:-[a-z]{2})?))?_(\d{8})(?:_\d{6})?', filename)
-    
+@PROFILER.timed("render_front_matter")
+def render_front_matter(pr_file, content, available_languages, stored=None):
+    """Render a Markdown file with front matter
+    
+    stored is the metadata recorded for a document that is unchanged since,
+    it is used instead of parsing the header again.
+    Returns the new file content and the derived metadata.
+    """
     # Initialize title with PR number
     title = "Pull Request"
     language_code = "en"  # Default language
     
-    if match:
-        pr_number = match.group(1)
-        # Extract language code if present, otherwise default to "en"
-        language_code = match.group(2) if match.group(2) else "en"
-        date_str = match.group(3)
-        # Time part is now optional and ignored for processing
-        
-        # Initialize title with PR number
-        title = f"#{pr_number}"
-        
-        # Try multiple patterns to extract a better title from content
-        title_found = False
-        
-        # Pattern 1: Look for "# Title: XXX" at the beginning of the document
-        title_match = re.search(r'# Title: (.*?)(?:\r?\n)', content)
-        if title_match:
-            title = f"#{pr_number} {title_match.group(1).strip()}"
-            title_found = True
-        
-        # Pattern 2: Look for "**Title**: XXX" in the Basic Information section
-        if not title_found:
-            # First try to find the Basic Information section
-            basic_info_match = re.search(r'## Basic Information(.*?)(?:##|\Z)', content, re.DOTALL)
-            if basic_info_match:
-                basic_info_content = basic_info_match.group(1)
-                # Then look for the title within that section
-                title_in_section_match = re.search(r'\*\*Title\*\*: (.*?)(?:\r?\n)', basic_info_content)
-                if title_in_section_match:
-                    title = f"#{pr_number} {title_in_section_match.group(1).strip()}"
-                    title_found = True
-        
-        # Pattern 3: Look for "**标题**: XXX" pattern in Chinese docs
-        if not title_found:
-            title_match = re.search(r'\*\*标题\*\*:\s*`?(.*?)`?(?:\r?\n|\*\*)', content)
-            if title_match:
-                title = f"#{pr_number} {title_match.group(1).strip()}"
-                title_found = True
+    if stored is not None:
+        metadata = stored
+    else:
+        # PR number, language and date come from the file name, title and labels from the header
+        with PROFILER.phase("extract_pr_metadata"):
+            record = extract_pr_metadata(content, pr_file.file_name)
+        metadata = metadata_from_record(record)
+    labels = metadata["labels"]
+    
+    if "pr_number" in metadata:
+        language_code = metadata["language"]
+        date = metadata["date"]
+        title = metadata["title"]
         
         # Escape the title for TOML
         escaped_title = escape_toml_string(title)
         
-        # Format date (YYYYMMDD -> YYYY-MM-DD 00:00)
-        date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}T00:00:00"
-        
-        # Extract PR labels
-        labels = extract_labels(content)
-        
-        # Filter out unwanted labels
-        labels = [label for label in labels if label not in FILTERED_LABELS]
-        
-        # Find other language versions of the same PR
-        available_languages = find_language_versions(md_file_path, pr_number)
-        
         # Format available languages as TOML table
         languages_toml = "{"
         for lang, info in available_languages.items():
@@ -480,16 +404,12 @@ def ensure_front_matter(md_file_path):
                 
                 new_front_matter += "+++"
                 
-                # Update file with new front matter
-                with open(md_file_path, "w", encoding="utf-8") as f:
-                    # Ensure exactly one newline between front matter and content
-                    if not content_after_front_matter.startswith('\n') and not content_after_front_matter.startswith('\r\n'):
-                        f.write(new_front_matter + "\n\n" + content_after_front_matter)
-                    else:
-                        f.write(new_front_matter + "\n" + content_after_front_matter)
+                print(f"Updated front matter: {pr_file.path}")
                 
-                print(f"Updated front matter: {md_file_path}")
-                return
+                # Ensure exactly one newline between front matter and content
+                if not content_after_front_matter.startswith('\n') and not content_after_front_matter.startswith('\r\n'):
+                    return new_front_matter + "\n\n" + content_after_front_matter, metadata
+                return new_front_matter + "\n" + content_after_front_matter, metadata
         else:
             # Create sections structure for front matter
             sections = {}
@@ -571,55 +491,352 @@ def ensure_front_matter(md_file_path):
         
         front_matter += "+++"
     
-    # Add front matter to file
-    with open(md_file_path, "w", encoding="utf-8") as f:
-        # Check if content already starts with newlines to avoid duplicate empty lines
-        if content.startswith('\n') or content.startswith('\r\n'):
-            # Content already has leading newlines, so just add front matter
-            f.write(front_matter + "\n" + content.lstrip('\r\n'))
-        else:
-            # No leading newlines in content, add a separator
-            f.write(front_matter + "\n\n" + content)
+    # Add front matter to content
+    # Check if content already starts with newlines to avoid duplicate empty lines
+    if content.startswith('\n') or content.startswith('\r\n'):
+        # Content already has leading newlines, so just add front matter
+        return front_matter + "\n" + content.lstrip('\r\n'), metadata
+    # No leading newlines in content, add a separator
+    return front_matter + "\n\n" + content, metadata
+
+def strip_front_matter(content):
+    """Remove existing front matter from Markdown content if present"""
+    if content.startswith("+++"):
+        front_matter_match = FRONT_MATTER_PATTERN.match(content)
+        if front_matter_match:
+            content = content[front_matter_match.end():].lstrip('\r\n')
+    return content
+
+@PROFILER.timed("read_header")
+def read_markdown_header(pr_file, title_needed=True):
+    """Read the header of a PR file, or the whole file if its title may lie beyond the header"""
+    header = read_pr_header(pr_file.path)
+    # A "# Title:" heading anywhere in the document wins over the header's Title fields,
+    # so without one in the header the rest of the document has to be searched as well
+    if (title_needed and not header.complete and pr_file.pr_number
+            and not TITLE_HEADING_PATTERN.search(strip_front_matter(header.text))):
+        header = read_pr_header(pr_file.path, full=True)
+    return header
+
+def rewrite_markdown_file(pr_file, available_languages, stored=None):
+    """Regenerate the front matter of a Markdown file from its header, or from its stored metadata
+    
+    When the front matter changes, the body after the header is streamed from the
+    old file into a temporary file in a single write, which then atomically replaces it.
+    Returns the derived metadata and the SHA-256 digest of the written file,
+    or None as digest if the file was already up to date.
+    """
+    header = read_markdown_header(pr_file, title_needed=stored is None)
+    PROFILER.count("pr_bytes_read", header.size)
+    
+    # Force update by removing front matter, and then rendering fresh front matter
+    new_header, metadata = render_front_matter(pr_file, strip_front_matter(header.text), available_languages,
+                                               stored)
+    if new_header == header.text:
+        return metadata, None
+    
+    new_header = new_header.encode("utf-8")
+    with PROFILER.phase("atomic_rewrite"):
+        digest = atomic_rewrite(pr_file.path, new_header, header.size)
+    # The body after the header is streamed from the old file into the new one
+    body_size = pr_file.stat.st_size - header.size
+    PROFILER.count("pr_bytes_read", body_size)
+    PROFILER.count("pr_bytes_written", len(new_header) + body_size)
+    return metadata, digest
+
+def rewrite_month_chunk(chunk):
+    """Rewrite a month worth of files, recording the time spent on each"""
+    results = []
+    for pr_file, available_languages, stored in chunk:
+        start = time.perf_counter()
+        results.append(rewrite_markdown_file(pr_file, available_languages, stored))
+        PROFILER.file_time(pr_file.rel_path, time.perf_counter() - start)
+    return results
+
+def profiled_month_chunk(chunk):
+    """Rewrite a month chunk inside a worker process, returns the results and the worker's profile"""
+    # Forked workers inherit the parent's counters
+    PROFILER.reset()
+    results = rewrite_month_chunk(chunk)
+    return results, PROFILER.snapshot()
+
+def rewrite_markdown_files(pr_files, index, jobs=1, stored_metadata=None):
+    """Rewrite files serially or across a process pool in month-sized chunks
+    
+    stored_metadata maps relative paths of unchanged files to their recorded metadata.
+    Per-file work is independent, so the output is identical to the serial run.
+    Yields (pr_file, metadata, digest) in index order.
+    """
+    stored_metadata = stored_metadata or {}
+    chunks = OrderedDict()
+    for pr_file in pr_files:
+        chunks.setdefault(pr_file.dir_path, []).append(
+            (pr_file, index.language_versions(pr_file), stored_metadata.get(pr_file.rel_path)))
+    
+    if jobs > 1 and len(chunks) > 1:
+        results = []
+        with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as executor:
+            for chunk_results, profile in executor.map(profiled_month_chunk, chunks.values()):
+                results.append(chunk_results)
+                PROFILER.merge(profile)
+    else:
+        results = [rewrite_month_chunk(chunk) for chunk in chunks.values()]
     
-    # print(f"Added front matter: {md_file_path}")
+    for chunk, chunk_results in zip(chunks.values(), results):
+        for (pr_file, _, _), (metadata, digest) in zip(chunk, chunk_results):
+            yield pr_file, metadata, digest
 
-def process_markdown_files(dir_path, force_update=False):
-    """Process all Markdown files in the directory"""
-    for root, _, files in os.walk(dir_path):
-        for file in files:
-            if file.endswith(".md") and file != "_index.md":
-                md_file_path = os.path.join(root, file)
-                if force_update:
-                    # Force update by reading the file, removing front matter, and then ensuring front matter
-                    with open(md_file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    
-                    # Remove existing front matter if present
-                    if content.startswith("+++"):
-                        front_matter_match = re.match(r'\+\+\+(.*?)\+\+\+', content, re.DOTALL)
-                        if front_matter_match:
-                            content = content[front_matter_match.end():].lstrip('\r\n')
-                            
-                            # Write content without front matter
-                            with open(md_file_path, "w", encoding="utf-8") as f:
-                                f.write(content)
-                
-                # Now ensure front matter (it will be added since we removed it)
-                ensure_front_matter(md_file_path)
+def process_markdown_files(index, store, stats, full=True, jobs=1):
+    """Process the Markdown files of the corpus index
+    
+    In incremental mode only files whose content or set of translations changed
+    are rewritten and upserted into the metadata store; unchanged files keep
+    their stored rows. Files whose content is unchanged and only gained or lost
+    a translation are rendered from their stored metadata. Files whose front matter is already up to date are left untouched.
+    Returns the set of directories whose label rollups must be refreshed and
+    the number of files scanned and rewritten. Rewritten files, and in
+    incremental mode files that are new to the store or changed on disk, are
+    added to the change set of stats. A full run has no baseline, so it only
+    reports what it rewrote.
+    """
+    dirty_dirs = set()
+    pending = []
+    # Relative path -> "created" or "modified", files that changed on disk since the last run
+    changed = {}
+    # Relative path -> recorded metadata, files that only need new language links
+    stored_metadata = {}
+    rewritten = 0
+    
+    with PROFILER.phase("change_detection"):
+        for pr_file in index.files.values():
+            # Reprocess when the file itself changed or its set of translations changed
+            entry = store.get(pr_file.rel_path)
+            unchanged = (not full and entry is not None
+                         and store.is_unchanged(pr_file.rel_path, pr_file.path, pr_file.stat))
+            if unchanged and entry["languages"] == index.language_signature(pr_file):
+                PROFILER.count("files_skipped")
+                continue
+            pending.append(pr_file)
+            if unchanged:
+                stored_metadata[pr_file.rel_path] = store.metadata(pr_file.rel_path)
+            elif not full:
+                changed[pr_file.rel_path] = "created" if entry is None else "modified"
+    PROFILER.count("files_reprocessed", len(pending))
+    PROFILER.count("files_from_store", len(stored_metadata))
+    
+    # Month-level label aggregation is queried from the store afterwards
+    for pr_file, metadata, digest in rewrite_markdown_files(pending, index, jobs, stored_metadata):
+        with PROFILER.phase("store_record"):
+            store.record(pr_file, metadata, index.language_signature(pr_file), digest)
+        if pr_file.rel_path in changed:
+            stats.note_change(pr_file.path, changed[pr_file.rel_path])
+        stats.record(pr_file.path, digest is not None)
+        if digest is not None:
+            rewritten += 1
+        
+        # Month rollups include files from the month directory and one level below
+        dirty_dirs.add(pr_file.dir_path)
+        dirty_dirs.add(os.path.dirname(pr_file.dir_path))
+    
+    # Forget removed files, their months need fresh rollups as well
+    for rel_path in store.paths():
+        if rel_path not in index.files:
+            store.remove(rel_path)
+            PROFILER.count("files_removed")
+            stats.note_change(os.path.join(index.content_dir, rel_path), "deleted")
+            removed_dir = os.path.dirname(os.path.join(index.content_dir, rel_path))
+            dirty_dirs.add(os.path.normpath(removed_dir))
+            dirty_dirs.add(os.path.normpath(os.path.dirname(removed_dir)))
+    
+    PROFILER.count("files_scanned", len(index.files))
+    PROFILER.count("files_rewritten", rewritten)
+    return dirty_dirs, len(index.files), rewritten
 
-def main():
-    """Main function"""
+def process_attachments(index, store, stats, full=True):
+    """Add created, modified and removed attachments (e.g. pr_<n>.patch) to the change set
+    
+    Attachments do not affect generated output, but the pages link to them, so
+    publish.py has to stage them with the documents. A full run only records them.
+    """
+    recorded = set(store.attachment_paths())
+    for rel_path, (path, stat_result) in index.attachments.items():
+        state = store.attachment_state(rel_path)
+        if state == (stat_result.st_size, stat_result.st_mtime_ns):
+            continue
+        if not full:
+            stats.note_change(path, "created" if state is None else "modified")
+        store.record_attachment(rel_path, stat_result)
+    
+    for rel_path in recorded - set(index.attachments):
+        store.remove_attachment(rel_path)
+        if not full:
+            stats.note_change(os.path.join(index.content_dir, rel_path), "deleted")
+
+def generate_index(content_dir, store, full=False, jobs=1, previous=None):
+    """Run one generation pass over the content directory
+    
+    previous is the corpus index of an earlier pass, whose unchanged directory listings are reused.
+    Returns the output stats, the number of Markdown files scanned and rewritten, and the corpus index.
+    """
     # Ensure directory exists
-    if not os.path.exists(CONTENT_DIR):
-        os.makedirs(CONTENT_DIR)
-        print(f"Created directory: {CONTENT_DIR}")
+    if not os.path.exists(content_dir):
+        os.makedirs(content_dir)
+        print(f"Created directory: {content_dir}")
+    
+    # Scan the corpus once: every directory is listed once and every file stat'ed once
+    with PROFILER.phase("scan"):
+        index = PRCorpusIndex(content_dir).scan(None if full else previous)
+    
+    # Only files whose rendered bytes differ from what is on disk are written
+    stats = OutputStats()
     
-    # Process directory structure
-    process_directory(CONTENT_DIR)
+    # Process Markdown files, each file is read at most once
+    with PROFILER.phase("process_markdown_files"):
+        dirty_dirs, scanned, rewritten = process_markdown_files(index, store, stats, full=full, jobs=jobs)
     
-    # Process Markdown files with force update
-    process_markdown_files(CONTENT_DIR, force_update=True)
+    with PROFILER.phase("process_attachments"):
+        process_attachments(index, store, stats, full=full)
     
+    # Process directory structure and refresh label rollups from the store
+    with PROFILER.phase("process_directory"):
+        process_directory(content_dir, index, store, stats, label_dirs=None if full else dirty_dirs)
+    
+    with PROFILER.phase("store_save"):
+        store.save()
+    return stats, scanned, rewritten, index
+
+def generate(content_dir=CONTENT_DIR, options=None):
+    """Run one generation pass in-process and return a GenerateResult
+    
+    Exceptions do not propagate, they end the run and are listed in the result's errors.
+    """
+    options = options or GenerateOptions()
+    store = options.store
+    full = options.full
+    if store is None:
+        store = PRMetadataStore(options.store_path, {"filtered_labels": FILTERED_LABELS})
+    
+    PROFILER.reset()
+    start = time.perf_counter()
+    stats, scanned, rewritten, index = OutputStats(), 0, 0, None
+    errors = []
+    try:
+        if options.store is None:
+            # Always load, so that a full run also forgets rows of removed files
+            full = not store.load() or full
+        stats, scanned, rewritten, index = generate_index(content_dir, store, full=full, jobs=options.jobs,
+                                                          previous=options.index)
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        if options.store is None:
+            store.close()
+    wall_seconds = time.perf_counter() - start
+    
+    mode = "full" if full else "incremental"
+    change_set = stats.change_set(ROOT_DIR)
+    # A full run has no baseline and a failed one may have stopped halfway, neither knows all it changed
+    change_set["complete"] = not full and not errors
+    try:
+        if options.pending:
+            merge_pending_changes(options.pending, change_set, ROOT_DIR)
+        if options.changes:
+            write_change_set(options.changes, change_set)
+        if options.profile:
+            os.makedirs(os.path.dirname(os.path.abspath(options.profile)), exist_ok=True)
+            PROFILER.write_report(options.profile,
+                                  mode=mode,
+                                  jobs=options.jobs,
+                                  wall_seconds=round(wall_seconds, 6),
+                                  files_scanned=scanned,
+                                  files_rewritten=rewritten,
+                                  output_files_written=stats.written,
+                                  output_files_unchanged=stats.unchanged,
+                                  errors=errors)
+    except OSError as e:
+        errors.append(f"Cannot write report: {e}")
+    
+    report = PROFILER.report()
+    return GenerateResult(mode, scanned, rewritten, stats.written, stats.unchanged,
+                          change_set, wall_seconds, report["timers"], report["counters"], errors,
+                          None if errors else index)
+
+def watch_and_regenerate(content_dir, store, jobs=1):
+    """Regenerate affected PR files, their translations and month indexes on every change"""
+    index = None
+    
+    def regenerate(changed_paths):
+        nonlocal index
+        # The store limits the pass to changed files, their siblings and their months,
+        # the index of the previous pass saves listing directories that did not change
+        result = generate(content_dir, GenerateOptions(jobs=jobs, store=store, index=index))
+        index = result.index
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        for error in result.errors:
+            print(f"[{timestamp}] Error: {error}")
+        if result.output_written:
+            print(f"[{timestamp}] {len(changed_paths)} changed paths: {result.files_rewritten} of "
+                  f"{result.files_scanned} Markdown files rewritten, output files: "
+                  f"{result.output_written} written, {result.output_unchanged} unchanged")
+    
+    watch(content_dir, regenerate)
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Generate _index.md files and PR front matter")
+    parser.add_argument("--full", action="store_true",
+                        help="Rewrite front matter of every file instead of only changed ones")
+    parser.add_argument("--store", default=STORE_FILE,
+                        help="Path of the SQLite metadata store (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="Number of worker processes for front matter rewrites (default: %(default)s)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate affected files whenever the content changes")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_FILE, metavar="REPORT",
+                        help="Write per-phase timings and counters as JSON (default: %(const)s)")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="Also write a cProfile dump of the main process, e.g. for snakeviz or pstats")
+    parser.add_argument("--changes", metavar="FILE",
+                        help="Write the created, modified and deleted paths, relative to the repository root, as JSON")
+    args = parser.parse_args()
+    
+    store = PRMetadataStore(args.store, {"filtered_labels": FILTERED_LABELS})
+    # Always load, so that a full run also forgets rows of removed files
+    loaded = store.load()
+    options = GenerateOptions(full=args.full or not loaded, jobs=args.jobs, store=store,
+                              changes=args.changes, profile=args.profile)
+    
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    result = generate(CONTENT_DIR, options)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+    
+    if result.errors:
+        store.close()
+        for error in result.errors:
+            print(f"Error: {error}")
+        sys.exit(1)
+    
+    if result.mode == "incremental":
+        print(f"Incremental update: {result.files_rewritten} of {result.files_scanned} Markdown files rewritten")
+    print(f"Output files: {result.output_written} written, {result.output_unchanged} unchanged")
+    
+    if args.changes:
+        change_set = result.change_set
+        print(f"Change set written to {args.changes}: {len(change_set['created'])} created, "
+              f"{len(change_set['modified'])} modified, {len(change_set['deleted'])} deleted"
+              + ("" if change_set["complete"] else " (incomplete, full run)"))
+    
+    if args.profile:
+        print(f"Profile written to {args.profile} ({result.wall_seconds:.2f}s)")
+    
+    if args.watch:
+        watch_and_regenerate(CONTENT_DIR, store, jobs=args.jobs)
+    
+    store.close()
     print("Done!")
 
 def test_escape_toml():
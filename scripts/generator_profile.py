@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Lightweight instrumentation for generate_index_files.py.
+Accumulates wall time and call counts per phase and per function, named
+counters (bytes read and written, files skipped and rewritten) and the
+slowest files of a run. Worker processes profile into their own instance and
+send a snapshot back, which the parent merges into the run totals.
+"""
+
+import time
+import json
+import heapq
+import functools
+from contextlib import contextmanager
+
+# Number of slowest files kept in a report
+SLOWEST_FILES = 10
+
+class Profiler:
+    def __init__(self, slowest=SLOWEST_FILES):
+        """Initialize empty timers and counters"""
+        self.slowest_count = slowest
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        # Name -> [calls, seconds]
+        self.timers = {}
+        # Name -> value
+        self.counters = {}
+        # Min-heap of (seconds, path), holds the slowest files
+        self.slowest = []
+
+    def add_time(self, name, seconds, calls=1):
+        """Add wall time to a timer"""
+        timer = self.timers.setdefault(name, [0, 0.0])
+        timer[0] += calls
+        timer[1] += seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of code under name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator timing every call of a function under name"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_time(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        """Increase a counter"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def file_time(self, path, seconds):
+        """Record the processing time of a file, keeping only the slowest ones"""
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, (seconds, path))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, path))
+
+    def snapshot(self):
+        """Return everything recorded as plain data, e.g. to send it out of a worker process"""
+        return {
+            "timers": {name: list(timer) for name, timer in self.timers.items()},
+            "counters": dict(self.counters),
+            "slowest": list(self.slowest),
+        }
+
+    def merge(self, snapshot):
+        """Add a snapshot taken in another process"""
+        for name, (calls, seconds) in snapshot["timers"].items():
+            self.add_time(name, seconds, calls)
+        for name, value in snapshot["counters"].items():
+            self.count(name, value)
+        for seconds, path in snapshot["slowest"]:
+            self.file_time(path, seconds)
+
+    def report(self):
+        """Return a JSON-friendly report, timers sorted by total time"""
+        timers = sorted(self.timers.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "timers": {name: {"calls": calls, "seconds": round(seconds, 6)} for name, (calls, seconds) in timers},
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_files": [{"path": path, "seconds": round(seconds, 6)}
+                              for seconds, path in sorted(self.slowest, reverse=True)],
+        }
+
+    def write_report(self, report_path, **extra):
+        """Write the report and any extra top-level fields as JSON"""
+        data = dict(extra)
+        data.update(self.report())
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+# Process-wide profiler used by the generator and its worker processes
+PROFILER = Profiler()
@@ -7,21 +7,69 @@ Generic WASM project publisher for any Rust project with WASM binaries
 
 import os
 import sys
-import shutil
-import subprocess
 import datetime
 import configparser
 import toml
 import re
 import time
+import json
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from build_cache import BuildCache, toolchain_version
+from build_runner import run_logged
+from publish_trace import Tracer
+from file_output import OutputStats, file_matches, write_if_changed, copy_if_changed, write_change_set
+from wasm_size import measure, optimize_wasm, budget_for
+from asset_sync import LINK_MODES, sync_tree
+from blob_store import BlobStore
+from wasm_fingerprint import MANIFEST_NAME, fingerprint_name, link_module, render_manifest, stale_artifacts
+
+# Build script of the source repository, relative to its root
+BUILD_SCRIPT = os.path.join('wasm', 'build_serve.sh')
+# Shared sources hashed into every build cache key unless wasm_publish.toml lists others
+DEFAULT_SHARED_PATHS = ['src']
+# Seconds before a build is stopped
+BUILD_TIMEOUT = 600
+# Output lines shown when a build fails, the full output is in the build log
+FAILURE_TAIL_LINES = 10
+# Rust target of all WASM builds
+WASM_TARGET = 'wasm32-unknown-unknown'
+# Paths of the assets synced by the previous run
+ASSET_MANIFEST = os.path.join('.cache', 'asset_sync.json')
+# Directory below static/ of the target repository holding deduplicated artifacts
+STORE_DIR = 'wasm_store'
+# Files downloaded by a demo page, measured against the size budget
+DOWNLOAD_FILES = ['app.js', '{name}_bg.wasm']
 
 class GitHubAutoPublisher:
-    def __init__(self, config_path="build_config.ini"):
+    def __init__(self, config_path="build_config.ini", use_cache=True, batch=False, changes_path=None):
         """Initialize the auto publisher with configuration"""
         self.config_path = config_path
         self.config = self.load_config()
         self.start_time = time.time()
-        self.step_times = {}
+        # Spans of this run, log lines are recorded as span events
+        self.tracer = Tracer()
+        self.output_stats = OutputStats()
+        # Builds may run on worker threads, keep log lines whole
+        self.log_lock = threading.Lock()
+        # Per-binary build logs, relative paths are relative to the working directory
+        self.log_dir = os.path.abspath(self.config.get('PATHS', 'log_dir', fallback='build_logs'))
+        # Content-addressed artifact store, created once the publish configuration is loaded
+        self.use_cache = use_cache
+        self.build_cache = None
+        self.publish_config = {}
+        # Compile all binaries in one cargo invocation instead of one build script run each
+        self.batch = batch
+        # Binary name -> measured download sizes, written to wasm_sizes.json in the log directory
+        self.wasm_sizes = OrderedDict()
+        self.asset_stats = None
+        # Shared content-addressed artifact store, created once the publish configuration is loaded
+        self.blob_store = None
+        # Change set of the target repository, written to the log directory unless a path is given
+        self.changes_path = os.path.abspath(changes_path or os.path.join(self.log_dir, 'publish_changes.json'))
         
     def log_step(self, step_name, message=""):
         """Log a step with timestamp and elapsed time"""
@@ -29,20 +77,22 @@ class GitHubAutoPublisher:
         elapsed = current_time - self.start_time
         timestamp = datetime.datetime.now().strftime('%H:%M:%S')
         
-        if message:
-            print("[{}] [+{:.1f}s] {}: {}".format(timestamp, elapsed, step_name, message))
-        else:
-            print("[{}] [+{:.1f}s] {}".format(timestamp, elapsed, step_name))
+        with self.log_lock:
+            if message:
+                print("[{}] [+{:.1f}s] {}: {}".format(timestamp, elapsed, step_name, message))
+            else:
+                print("[{}] [+{:.1f}s] {}".format(timestamp, elapsed, step_name))
         
-        self.step_times[step_name] = current_time
+        self.tracer.event(step_name, message)
         
     def log_progress(self, current, total, operation):
         """Log progress for multi-step operations"""
         percentage = (current / total) * 100 if total > 0 else 0
         elapsed = time.time() - self.start_time
         timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        print("[{}] [+{:.1f}s] Progress: {}/{} ({:.1f}%) - {}".format(
-            timestamp, elapsed, current, total, percentage, operation))
+        with self.log_lock:
+            print("[{}] [+{:.1f}s] Progress: {}/{} ({:.1f}%) - {}".format(
+                timestamp, elapsed, current, total, percentage, operation))
         
     def load_config(self):
         """Load configuration file"""
@@ -67,6 +117,7 @@ class GitHubAutoPublisher:
             self.log_step("CONFIG_PARSE", "Parsing TOML configuration")
             with open(publish_config_path, 'r', encoding='utf-8') as f:
                 publish_config = toml.load(f)
+            self.publish_config = publish_config
             
             binaries = publish_config.get('publish', {}).get('binaries', [])
             self.log_step("CONFIG_SUCCESS", "Loaded {} specified binaries".format(len(binaries)))
@@ -167,62 +218,49 @@ class GitHubAutoPublisher:
                 
         return unique_tags
     
+    def build_log_path(self, binary_name):
+        """Return the path of the build log of a binary"""
+        return os.path.join(self.log_dir, '{}.log'.format(binary_name))
+    
     def build_wasm(self, binary_name):
-        """Build WASM for a specific binary"""
+        """Build WASM for a specific binary
+        
+        The build runs with the source repository as its working directory, without
+        changing the process-wide cwd, so several builds can run concurrently.
+        Build output is streamed into a per-binary log file.
+        """
         build_start = time.time()
         self.log_step("BUILD_START", "Building WASM for: {}".format(binary_name))
         
         source_repo = self.config['PATHS']['source_repo']
-        original_cwd = os.getcwd()
+        os.makedirs(self.log_dir, exist_ok=True)
+        log_path = self.build_log_path(binary_name)
         
-        self.log_step("BUILD_CHDIR", "Changing to source directory: {}".format(source_repo))
-        os.chdir(source_repo)
+        def report_progress(line_count, last_line):
+            self.log_step("BUILD_PROGRESS", "{} [{:.0f}s, {} lines] {}".format(
+                binary_name, time.time() - build_start, line_count, last_line[:120]))
         
         try:
-            command = ['bash', 'wasm/build_serve.sh', binary_name, '--build-only']
-            self.log_step("BUILD_EXEC", "Executing: {}".format(' '.join(command)))
-            
-            # Start the build process
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                errors='replace'
-            )
+            command = ['bash', BUILD_SCRIPT, binary_name, '--build-only']
+            self.log_step("BUILD_EXEC", "Executing: {} (in {}, log: {})".format(' '.join(command), source_repo, log_path))
             
-            # Monitor the process with periodic updates
-            timeout = 600  # 10 minutes
-            poll_interval = 10  # 10 seconds
-            elapsed = 0
-            
-            while process.poll() is None and elapsed < timeout:
-                time.sleep(poll_interval)
-                elapsed += poll_interval
-                self.log_step("BUILD_PROGRESS", "Building {} for {:.0f}s...".format(binary_name, elapsed))
+            result = run_logged(command, source_repo, log_path, BUILD_TIMEOUT, on_progress=report_progress)
+            build_time = time.time() - build_start
             
-            if process.poll() is None:
-                # Timeout reached
-                process.terminate()
-                self.log_step("BUILD_TIMEOUT", "Build timeout after {}s".format(timeout))
+            if result.timed_out:
+                self.log_step("BUILD_TIMEOUT", "Build of {} timed out after {}s and was stopped, see {}".format(
+                    binary_name, BUILD_TIMEOUT, log_path))
+                self.print_failure_tail(result.tail)
                 return False
             
-            # Get the results
-            stdout, stderr = process.communicate()
-            build_time = time.time() - build_start
-            
-            if process.returncode != 0:
-                self.log_step("BUILD_FAILED", "Build failed in {:.1f}s".format(build_time))
-                # Print last few lines of stderr for debugging
-                if stderr:
-                    error_lines = stderr.strip().split('\n')[-5:]
-                    for line in error_lines:
-                        print("    ERROR: {}".format(line))
+            if result.returncode != 0:
+                self.log_step("BUILD_FAILED", "Build of {} failed with exit code {} in {:.1f}s, see {}".format(
+                    binary_name, result.returncode, build_time, log_path))
+                self.print_failure_tail(result.tail)
                 return False
             
             # Check output directory
-            output_dir = "wasm/output/{}".format(binary_name)
+            output_dir = os.path.join(source_repo, 'wasm', 'output', binary_name)
             self.log_step("BUILD_CHECK", "Checking output directory: {}".format(output_dir))
             
             if not os.path.exists(output_dir):
@@ -230,8 +268,9 @@ class GitHubAutoPublisher:
                 return False
             
             # List generated files
-            files = os.listdir(output_dir)
-            self.log_step("BUILD_SUCCESS", "Build completed in {:.1f}s, {} files generated".format(build_time, len(files)))
+            files = sorted(os.listdir(output_dir))
+            self.log_step("BUILD_SUCCESS", "Built {} in {:.1f}s ({} output lines), {} files generated".format(
+                binary_name, build_time, result.lines, len(files)))
             
             # Log generated files for verification
             wasm_files = [f for f in files if f.endswith('.wasm') or f.endswith('.js')]
@@ -242,11 +281,329 @@ class GitHubAutoPublisher:
             
         except Exception as e:
             build_time = time.time() - build_start
-            self.log_step("BUILD_ERROR", "Build error after {:.1f}s: {}".format(build_time, e))
+            self.log_step("BUILD_ERROR", "Build of {} failed after {:.1f}s: {}".format(binary_name, build_time, e))
             return False
-        finally:
-            os.chdir(original_cwd)
-            self.log_step("BUILD_RESTORE", "Restored working directory")
+    
+    def print_failure_tail(self, tail, lines=FAILURE_TAIL_LINES):
+        """Print the last lines of a failed build for debugging"""
+        with self.log_lock:
+            for line in tail[-lines:]:
+                print("    ERROR: {}".format(line))
+    
+    def create_build_cache(self):
+        """Create the build cache from build_config.ini and the [cache] section of wasm_publish.toml"""
+        if not self.use_cache:
+            self.log_step("BUILD_CACHE", "Build cache disabled")
+            return None
+        
+        source_repo = self.config['PATHS']['source_repo']
+        cache_dir = os.path.abspath(self.config.get('PATHS', 'cache_dir', fallback=os.path.join('.cache', 'wasm_build')))
+        shared_paths = self.publish_config.get('cache', {}).get('shared_paths', DEFAULT_SHARED_PATHS)
+        
+        self.log_step("BUILD_CACHE", "Using {} (shared sources: {})".format(cache_dir, ', '.join(shared_paths)))
+        toolchain = toolchain_version()
+        # Batched and build script runs produce different artifacts, only a build script run reads the script
+        build_script = None
+        if self.batch:
+            build_config = {name: value for name, value in self.publish_config.get('build', {}).items() if name != 'timeout'}
+            toolchain += "\nmode: batch\nbuild: {}".format(json.dumps(build_config, sort_keys=True))
+        else:
+            toolchain += "\nmode: script"
+            build_script = BUILD_SCRIPT
+        # Cached artifacts are stored optimized, so the optimizer and its settings are build inputs
+        optimize_config = self.publish_config.get('optimize', {})
+        if optimize_config.get('enabled', False):
+            toolchain += "\n{}\noptimize: {}".format(
+                toolchain_version((('wasm-opt', '--version'),)), json.dumps(optimize_config, sort_keys=True))
+        return BuildCache(cache_dir, source_repo, shared_paths, build_script, toolchain)
+    
+    def optimize_binary(self, binary_name):
+        """Run the optional size optimization stage on a freshly built binary
+        
+        Settings come from the [optimize] section of wasm_publish.toml. A failed
+        optimizer run is logged and the unoptimized module is kept.
+        """
+        optimize_config = self.publish_config.get('optimize', {})
+        if not optimize_config.get('enabled', False):
+            return
+        
+        source_repo = self.config['PATHS']['source_repo']
+        wasm_path = os.path.join(source_repo, 'wasm', 'output', binary_name, '{}_bg.wasm'.format(binary_name))
+        if not os.path.exists(wasm_path):
+            self.log_step("WASM_OPTIMIZE_SKIP", "No module to optimize for {}".format(binary_name))
+            return
+        
+        before = os.path.getsize(wasm_path)
+        start = time.time()
+        log_path = os.path.join(self.log_dir, '{}.optimize.log'.format(binary_name))
+        with self.tracer.span("optimize", binary=binary_name, bytes_before=before) as span:
+            try:
+                action = optimize_wasm(wasm_path, optimize_config.get('wasm_opt_args', ['-Oz']),
+                                       optimize_config.get('strip_debug', True), log_path)
+            except (OSError, RuntimeError, ValueError, IndexError) as e:
+                span.fail(e)
+                self.log_step("WASM_OPTIMIZE_FAILED", "Keeping unoptimized {}: {}".format(binary_name, e))
+                return
+            
+            after = os.path.getsize(wasm_path)
+            span.set(action=action, bytes_after=after)
+        self.log_step("WASM_OPTIMIZE", "{}: {} in {:.1f}s, {:.1f}KB -> {:.1f}KB".format(
+            binary_name, action, time.time() - start, before/1024, after/1024))
+    
+    def check_size(self, binary_name):
+        """Record the raw and gzip download size of a binary and check it against its budget
+        
+        Budgets come from the [size_budget] section of wasm_publish.toml. Returns
+        False only when the budget is exceeded and on_exceed is "fail".
+        """
+        source_repo = self.config['PATHS']['source_repo']
+        output_dir = os.path.join(source_repo, 'wasm', 'output', binary_name)
+        
+        files = OrderedDict()
+        for filename in DOWNLOAD_FILES:
+            path = os.path.join(output_dir, filename.format(name=binary_name))
+            if os.path.exists(path):
+                files[os.path.basename(path)] = measure(path)._asdict()
+        total = {metric: sum(size[metric] for size in files.values()) for metric in ('raw', 'gzip')}
+        self.wasm_sizes[binary_name] = {'files': files, 'total': total}
+        self.tracer.annotate(raw_bytes=total['raw'], gzip_bytes=total['gzip'])
+        self.log_step("WASM_SIZE", "{}: {:.1f}KB raw, {:.1f}KB gzip ({})".format(
+            binary_name, total['raw']/1024, total['gzip']/1024,
+            ', '.join("{} {:.1f}KB".format(name, size['gzip']/1024) for name, size in files.items())))
+        
+        budget_config = self.publish_config.get('size_budget', {})
+        budget = budget_for(budget_config, binary_name)
+        if budget is None:
+            return True
+        
+        metric = budget_config.get('metric', 'gzip')
+        size = total[metric]
+        self.wasm_sizes[binary_name]['budget'] = {'metric': metric, 'bytes': budget, 'exceeded': size > budget}
+        if size <= budget:
+            return True
+        
+        message = "{} is {:.1f}KB {}, over its budget of {:.1f}KB".format(binary_name, size/1024, metric, budget/1024)
+        if budget_config.get('on_exceed', 'fail') == 'warn':
+            self.log_step("WASM_BUDGET_WARNING", message)
+            return True
+        self.log_step("WASM_BUDGET_EXCEEDED", message)
+        return False
+    
+    def write_size_report(self):
+        """Write the measured sizes of this run to wasm_sizes.json in the log directory"""
+        if not self.wasm_sizes:
+            return
+        os.makedirs(self.log_dir, exist_ok=True)
+        report_path = os.path.join(self.log_dir, 'wasm_sizes.json')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.wasm_sizes, f, indent=2)
+        total = sum(sizes['total']['gzip'] for sizes in self.wasm_sizes.values())
+        self.log_step("WASM_SIZES", "{} binaries, {:.1f}KB gzip in total, see {}".format(
+            len(self.wasm_sizes), total/1024, report_path))
+    
+    def build_binary(self, binary_info):
+        """Restore a binary's artifacts from the build cache, or build it and store them"""
+        binary_name = binary_info['name']
+        with self.tracer.span("build", binary=binary_name) as span:
+            if self.build_cache is None:
+                span.set(cache="disabled")
+                if not self.compile_binary(binary_name):
+                    span.fail("build failed")
+                    return False
+                self.optimize_binary(binary_name)
+                return True
+            
+            source_repo = self.config['PATHS']['source_repo']
+            output_dir = os.path.join(source_repo, 'wasm', 'output', binary_name)
+            key = self.build_cache.key(binary_name, binary_info['path'])
+            span.set(cache_key=key[:12])
+            
+            if self.build_cache.restore(binary_name, key, output_dir):
+                span.set(cache="hit")
+                self.log_step("BUILD_CACHE_HIT", "Restored {} from cache ({})".format(binary_name, key[:12]))
+                return True
+            
+            span.set(cache="miss")
+            self.log_step("BUILD_CACHE_MISS", "No cached build of {} ({})".format(binary_name, key[:12]))
+            if not self.compile_binary(binary_name):
+                span.fail("build failed")
+                return False
+            self.optimize_binary(binary_name)
+            
+            if self.build_cache.store(binary_name, key, output_dir):
+                self.log_step("BUILD_CACHE_STORE", "Stored build of {} ({})".format(binary_name, key[:12]))
+            return True
+    
+    def compile_binary(self, binary_name):
+        """Run the build script of a binary in a traced span"""
+        with self.tracer.span("compile", binary=binary_name) as span:
+            success = self.build_wasm(binary_name)
+            if not success:
+                span.fail("build failed, see {}".format(self.build_log_path(binary_name)))
+        return success
+    
+    def cargo_artifact_dir(self, profile):
+        """Return the directory cargo writes WASM binaries of a profile to"""
+        source_repo = self.config['PATHS']['source_repo']
+        target_dir = os.environ.get('CARGO_TARGET_DIR', os.path.join(source_repo, 'target'))
+        # The dev profile is written to target/<triple>/debug
+        return os.path.join(target_dir, WASM_TARGET, 'debug' if profile == 'dev' else profile)
+    
+    def bindgen_binary(self, binary_name, artifact_dir, bindgen_args):
+        """Generate the JS bindings of a compiled binary into wasm/output/<name>/
+        
+        Produces the same files as build_serve.sh: app.js, app.d.ts,
+        <name>_bg.wasm and <name>_bg.wasm.d.ts. Returns (success, seconds).
+        """
+        start = time.time()
+        source_repo = self.config['PATHS']['source_repo']
+        output_dir = os.path.join(source_repo, 'wasm', 'output', binary_name)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        command = ['wasm-bindgen', '--target', 'web', '--out-dir', output_dir, '--out-name', binary_name]
+        command += bindgen_args + [os.path.join(artifact_dir, '{}.wasm'.format(binary_name))]
+        self.log_step("BATCH_BINDGEN", "Generating bindings for {}".format(binary_name))
+        try:
+            result = run_logged(command, source_repo, self.build_log_path(binary_name), BUILD_TIMEOUT)
+        except OSError as e:
+            self.log_step("BATCH_BINDGEN_ERROR", "Cannot run wasm-bindgen for {}: {}".format(binary_name, e))
+            return False, time.time() - start
+        
+        if result.returncode != 0:
+            self.log_step("BATCH_BINDGEN_FAILED", "wasm-bindgen failed for {}, see {}".format(
+                binary_name, self.build_log_path(binary_name)))
+            self.print_failure_tail(result.tail)
+            return False, time.time() - start
+        
+        # The site loads the glue code as app.js, next to <name>_bg.wasm
+        for suffix in ('.js', '.d.ts'):
+            generated = os.path.join(output_dir, binary_name + suffix)
+            if os.path.exists(generated):
+                os.replace(generated, os.path.join(output_dir, 'app' + suffix))
+        
+        duration = time.time() - start
+        self.log_step("BATCH_BINDGEN_DONE", "Bindings for {} generated in {:.1f}s".format(binary_name, duration))
+        return True, duration
+    
+    def batch_build(self, binaries, jobs):
+        """Compile all binaries in one cargo invocation, then run bindgen and post-processing per binary in parallel
+        
+        Binaries restored from the build cache are not compiled. Settings come from
+        the [build] section of wasm_publish.toml, cargo is stopped after its
+        timeout (BUILD_TIMEOUT by default). Returns a dictionary of binary
+        name to build success, in the order of binaries.
+        """
+        build_config = self.publish_config.get('build', {})
+        profile = build_config.get('profile', 'release')
+        cargo_args = build_config.get('cargo_args', [])
+        bindgen_args = build_config.get('bindgen_args', [])
+        cargo_timeout = build_config.get('timeout', BUILD_TIMEOUT)
+        source_repo = self.config['PATHS']['source_repo']
+        os.makedirs(self.log_dir, exist_ok=True)
+        batch_start = time.time()
+        
+        results = OrderedDict((binary_info['name'], False) for binary_info in binaries)
+        keys = {}
+        pending = []
+        for binary_info in binaries:
+            binary_name = binary_info['name']
+            if self.build_cache is not None:
+                keys[binary_name] = self.build_cache.key(binary_name, binary_info['path'])
+                output_dir = os.path.join(source_repo, 'wasm', 'output', binary_name)
+                if self.build_cache.restore(binary_name, keys[binary_name], output_dir):
+                    self.log_step("BUILD_CACHE_HIT", "Restored {} from cache ({})".format(binary_name, keys[binary_name][:12]))
+                    results[binary_name] = True
+                    continue
+                self.log_step("BUILD_CACHE_MISS", "No cached build of {} ({})".format(binary_name, keys[binary_name][:12]))
+            pending.append(binary_name)
+        
+        if not pending:
+            self.log_step("BATCH_SKIP", "All binaries restored from cache")
+            return results
+        
+        # Phase 1: a single cargo invocation resolves and compiles shared crates once
+        command = ['cargo', 'build', '--target', WASM_TARGET, '--profile', profile] + cargo_args
+        for binary_name in pending:
+            command += ['--bin', binary_name]
+        log_path = os.path.join(self.log_dir, 'cargo_batch.log')
+        self.log_step("BATCH_CARGO", "Executing: {} (log: {})".format(' '.join(command), log_path))
+        
+        def report_progress(line_count, last_line):
+            self.log_step("BATCH_PROGRESS", "cargo [{:.0f}s, {} lines] {}".format(
+                time.time() - batch_start, line_count, last_line[:120]))
+        
+        with self.tracer.span("cargo", binaries=len(pending), profile=profile) as span:
+            try:
+                result = run_logged(command, source_repo, log_path, cargo_timeout, on_progress=report_progress)
+            except OSError as e:
+                span.fail(e)
+                self.log_step("BATCH_CARGO_ERROR", "Cannot run cargo: {}".format(e))
+                return results
+            cargo_time = result.duration
+            span.set(lines=result.lines)
+            
+            if result.returncode != 0:
+                reason = "timed out" if result.timed_out else "failed with exit code {}".format(result.returncode)
+                span.fail("cargo {}".format(reason))
+                self.log_step("BATCH_CARGO_FAILED", "cargo {} after {:.1f}s, see {}".format(reason, cargo_time, log_path))
+                self.print_failure_tail(result.tail)
+                return results
+        self.log_step("BATCH_CARGO_DONE", "Compiled {} binaries in {:.1f}s".format(len(pending), cargo_time))
+        
+        # Phase 2: bindgen, optimization and caching are independent per binary and run on the workers
+        artifact_dir = self.cargo_artifact_dir(profile)
+        bindgen_start = time.time()
+        batch_span = self.tracer.current()
+        
+        def bindgen(binary_name):
+            # Worker threads nest their spans under the batch span
+            with self.tracer.attach(batch_span):
+                with self.tracer.span("bindgen", binary=binary_name) as span:
+                    success, duration = self.bindgen_binary(binary_name, artifact_dir, bindgen_args)
+                    if not success:
+                        span.fail("wasm-bindgen failed")
+                if success:
+                    self.optimize_binary(binary_name)
+                if success and self.build_cache is not None:
+                    output_dir = os.path.join(source_repo, 'wasm', 'output', binary_name)
+                    if self.build_cache.store(binary_name, keys[binary_name], output_dir):
+                        self.log_step("BUILD_CACHE_STORE", "Stored build of {} ({})".format(binary_name, keys[binary_name][:12]))
+                return success, duration
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(pending)))) as executor:
+            bindgen_results = list(executor.map(bindgen, pending))
+        bindgen_time = time.time() - bindgen_start
+        
+        for binary_name, (success, _) in zip(pending, bindgen_results):
+            results[binary_name] = success
+        
+        slowest_name, (_, slowest_time) = max(zip(pending, bindgen_results), key=lambda item: item[1][1])
+        self.log_step("BATCH_TIMINGS", "cargo {:.1f}s | bindgen and post-processing {:.1f}s (slowest bindgen: {} {:.1f}s) | total {:.1f}s".format(
+            cargo_time, bindgen_time, slowest_name, slowest_time, time.time() - batch_start))
+        return results
+    
+    def build_all(self, binaries, jobs):
+        """Build binaries on a bounded worker pool
+        
+        Returns a dictionary of binary name to build success, in the order of binaries.
+        """
+        names = [binary_info['name'] for binary_info in binaries]
+        self.log_step("BUILD_POOL", "Building {} binaries with {} workers".format(len(names), jobs))
+        
+        pool_start = time.time()
+        pool_span = self.tracer.current()
+        
+        def build(binary_info):
+            # Worker threads nest their spans under the pool span
+            with self.tracer.attach(pool_span):
+                return self.build_binary(binary_info)
+        
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(build, binaries))
+        
+        self.log_step("BUILD_POOL_COMPLETE", "Built {}/{} binaries in {:.1f}s".format(
+            sum(results), len(names), time.time() - pool_start))
+        return dict(zip(names, results))
     
     def load_readme_content(self, binary_info):
         """Load README.md content for a binary"""
@@ -289,13 +646,48 @@ class GitHubAutoPublisher:
         self.log_step("README_DEFAULT", "No README found for {}, using default".format(binary_name))
         return None
 
-    def create_project_structure(self, binary_info):
-        """Create project directory structure for a binary"""
+    def read_content_date(self, content_path):
+        """Read the date of a previously published content.md, or None"""
+        try:
+            with open(content_path, 'r', encoding='utf-8') as f:
+                match = re.search(r'^date = (\S+)$', f.read(), re.MULTILINE)
+        except OSError:
+            return None
+        return match.group(1) if match else None
+
+    def create_blob_store(self):
+        """Create the shared artifact store from the [store] section of wasm_publish.toml"""
+        store_config = self.publish_config.get('store', {})
+        if not store_config.get('enabled', True):
+            self.log_step("STORE", "Shared artifact store disabled, artifacts are published per project")
+            return None
+        
+        target_repo = self.config['PATHS']['target_repo']
+        store_name = store_config.get('dir', STORE_DIR)
+        store_dir = os.path.join(target_repo, 'static', store_name)
+        self.log_step("STORE", "Publishing artifacts to {}".format(store_dir))
+        return BlobStore(store_dir, '/{}/'.format(store_name))
+    
+    def published_name(self, filename, data):
+        """Return the name an artifact is published under: a store URL, or a fingerprinted file name"""
+        if self.blob_store is not None:
+            return self.blob_store.url(self.blob_store.blob_name(data, os.path.splitext(filename)[1]))
+        return fingerprint_name(filename, data)
+    
+    def project_dir(self, binary_name):
+        """Return the content directory of a published binary"""
+        target_repo = self.config['PATHS']['target_repo']
+        return os.path.join(target_repo, 'content', 'projects', binary_name)
+    
+    def create_project_structure(self, binary_info, entry_path='app.js'):
+        """Create project directory structure for a binary
+        
+        entry_path is the published name of the JS entry point loaded by the wasm viewer.
+        """
         binary_name = binary_info['name']
         self.log_step("STRUCTURE_START", "Creating project structure for {}".format(binary_name))
         
-        target_repo = self.config['PATHS']['target_repo']
-        project_dir = os.path.join(target_repo, 'content', 'projects', binary_name)
+        project_dir = self.project_dir(binary_name)
         
         self.log_step("STRUCTURE_DIR", "Creating directory: {}".format(project_dir))
         os.makedirs(project_dir, exist_ok=True)
@@ -314,12 +706,12 @@ template = "project_section.html"
 
 '''.format(binary_info['display_name'], binary_info['description'])
         
-        with open(os.path.join(project_dir, '_index.md'), 'w', encoding='utf-8') as f:
-            f.write(index_content)
+        if not write_if_changed(os.path.join(project_dir, '_index.md'), index_content, self.output_stats):
+            self.log_step("STRUCTURE_UNCHANGED", "_index.md is up to date")
         
         # Create content.md
         self.log_step("STRUCTURE_CONTENT", "Creating content.md")
-        current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+        content_path = os.path.join(project_dir, 'content.md')
         tags_str = ', '.join(['"{}"'.format(tag) for tag in binary_info['tags']])
         
         # Use README content if available, otherwise use description
@@ -330,7 +722,8 @@ template = "project_section.html"
             content_text = "## {}\n\n{}".format(binary_info['display_name'], binary_info['description'])
             self.log_step("STRUCTURE_DEFAULT", "Using default description")
         
-        content_md = '''+++
+        def render_content(date):
+            return '''+++
 title = "{}"
 date = {}
 description = "{}"
@@ -342,25 +735,40 @@ tags = [{}]
 
 {}
 
-{{{{ wasm_viewer(path="app.js", id="{}-demo") }}}} 
+{{{{ wasm_viewer(path="{}", id="{}-demo") }}}} 
 
 '''.format(
-            binary_info['display_name'],
-            current_date,
-            binary_info['description'],
-            tags_str,
-            content_text,
-            binary_name
-        )
-        
-        with open(os.path.join(project_dir, 'content.md'), 'w', encoding='utf-8') as f:
-            f.write(content_md)
+                binary_info['display_name'],
+                date,
+                binary_info['description'],
+                tags_str,
+                content_text,
+                entry_path,
+                binary_name
+            )
+        
+        # Keep the previous publish date when nothing else changed, so republishing
+        # an unchanged project does not touch content.md
+        content_md = render_content(datetime.datetime.now().strftime('%Y-%m-%d'))
+        previous_date = self.read_content_date(content_path)
+        if previous_date and file_matches(content_path, render_content(previous_date)):
+            content_md = render_content(previous_date)
+        
+        if not write_if_changed(content_path, content_md, self.output_stats):
+            self.log_step("STRUCTURE_UNCHANGED", "content.md is up to date")
             
         self.log_step("STRUCTURE_COMPLETE", "Project structure created: {}".format(project_dir))
         return project_dir
     
     def copy_wasm_files(self, binary_name, project_dir):
-        """Copy WASM files to project directory"""
+        """Copy WASM files to project directory under content-hashed names
+        
+        The module is fingerprinted first and the glue code is rewritten to load
+        it, then the glue code is fingerprinted. Both go to the shared artifact
+        store when it is enabled, otherwise into the project directory. Returns
+        the manifest mapping app.js and <name>_bg.wasm to their published names
+        or store URLs, which is also written to the project directory.
+        """
         self.log_step("WASM_COPY_START", "Copying WASM files for {}".format(binary_name))
         
         source_repo = self.config['PATHS']['source_repo']
@@ -368,13 +776,43 @@ tags = [{}]
         
         self.log_step("WASM_SOURCE", "Source: {}".format(wasm_output_dir))
         
+        wasm_name = '{}_bg.wasm'.format(binary_name)
         wasm_files = [
             'app.js',
             'app.d.ts', 
-            '{}_bg.wasm'.format(binary_name),
+            wasm_name,
             '{}_bg.wasm.d.ts'.format(binary_name)
         ]
         
+        # Logical name -> published name and content; type declarations keep their names
+        manifest = OrderedDict()
+        published = OrderedDict()
+        wasm_path = os.path.join(wasm_output_dir, wasm_name)
+        if os.path.exists(wasm_path):
+            with open(wasm_path, 'rb') as f:
+                wasm_data = f.read()
+            manifest[wasm_name] = self.published_name(wasm_name, wasm_data)
+            published[wasm_name] = wasm_data
+        
+        js_path = os.path.join(wasm_output_dir, 'app.js')
+        if os.path.exists(js_path):
+            with open(js_path, 'r', encoding='utf-8') as f:
+                js_text = f.read()
+            linked = None
+            if wasm_name in manifest:
+                # Store blobs are siblings, so the glue code keeps loading the module relative to itself
+                linked = link_module(js_text, wasm_name, os.path.basename(manifest[wasm_name]))
+                if linked is None:
+                    self.log_step("WASM_FINGERPRINT_WARNING", "app.js does not reference {}, keeping its name".format(wasm_name))
+                    manifest[wasm_name] = wasm_name
+            js_data = (linked or js_text).encode('utf-8')
+            # Glue code next to an unfingerprinted module stays in the project directory
+            if linked is None:
+                manifest['app.js'] = fingerprint_name('app.js', js_data)
+            else:
+                manifest['app.js'] = self.published_name('app.js', js_data)
+            published['app.js'] = js_data
+        
         copied_files = []
         missing_files = []
         
@@ -383,23 +821,58 @@ tags = [{}]
             
             src_path = os.path.join(wasm_output_dir, filename)
             if os.path.exists(src_path):
-                dst_path = os.path.join(project_dir, filename)
-                shutil.copy2(src_path, dst_path)
-                file_size = os.path.getsize(src_path)
-                self.log_step("WASM_FILE", "Copied {} ({:.1f}KB)".format(filename, file_size/1024))
+                dst_name = manifest.get(filename, filename)
+                dst_path = os.path.join(project_dir, dst_name)
+                if filename in published and self.blob_store is not None and dst_name.startswith(self.blob_store.url_prefix):
+                    file_size = len(published[filename])
+                    changed = self.blob_store.put(published[filename], os.path.splitext(filename)[1])
+                    if changed:
+                        self.output_stats.note_change(
+                            os.path.join(self.blob_store.store_dir, os.path.basename(dst_name)), 'created')
+                elif filename in published:
+                    file_size = len(published[filename])
+                    changed = write_if_changed(dst_path, published[filename], self.output_stats)
+                else:
+                    file_size = os.path.getsize(src_path)
+                    changed = copy_if_changed(src_path, dst_path, self.output_stats)
+                if changed:
+                    self.log_step("WASM_FILE", "Copied {} ({:.1f}KB)".format(dst_name, file_size/1024))
+                else:
+                    self.log_step("WASM_FILE", "Unchanged {} ({:.1f}KB)".format(dst_name, file_size/1024))
                 copied_files.append(filename)
             else:
                 self.log_step("WASM_MISSING", "File not found: {}".format(filename))
                 missing_files.append(filename)
         
+        if manifest:
+            write_if_changed(os.path.join(project_dir, MANIFEST_NAME), render_manifest(manifest), self.output_stats)
+        self.tracer.annotate(files=len(copied_files), missing=len(missing_files),
+                             bytes=sum(len(data) for data in published.values()))
+        
         self.log_step("WASM_COPY_COMPLETE", "Copied {}/{} files".format(len(copied_files), len(wasm_files)))
         
         if missing_files:
             self.log_step("WASM_COPY_WARNINGS", "Missing files: {}".format(', '.join(missing_files)))
+        return manifest
+    
+    def remove_stale_artifacts(self, binary_name, project_dir, manifest):
+        """Delete artifacts of earlier publishes that the manifest no longer references"""
+        if len(manifest) < 2:
+            # Without a complete publish, the previous artifacts are still in use
+            return
+        for path in stale_artifacts(project_dir, binary_name, set(manifest.values())):
+            os.unlink(path)
+            self.output_stats.note_change(path, 'deleted')
+            self.log_step("WASM_GC", "Removed stale {}".format(os.path.basename(path)))
     
     def copy_assets(self):
-        """Copy assets to target repository"""
-        self.log_step("ASSETS_START", "Copying assets to target repository")
+        """Sync assets to target repository, copying only files that changed
+        
+        The link mode comes from the [assets] section of wasm_publish.toml:
+        "reflink" (default) or "hardlink" where the filesystem supports it,
+        otherwise files are copied.
+        """
+        self.log_step("ASSETS_START", "Syncing assets to target repository")
         
         source_repo = self.config['PATHS']['source_repo']
         target_repo = self.config['PATHS']['target_repo']
@@ -414,65 +887,121 @@ tags = [{}]
             return
             
         os.makedirs(target_assets, exist_ok=True)
-        self.log_step("ASSETS_TARGET", "Created target directory")
-        
-        def ignore_patterns(dir, files):
-            return [f for f in files if f.startswith('.git') or f.endswith('.gitkeep')]
-        
-        items = os.listdir(source_assets)
-        total_items = len(items)
-        self.log_step("ASSETS_SCAN", "Found {} items to copy".format(total_items))
         
-        for i, item in enumerate(items, 1):
-            self.log_progress(i, total_items, "Copying: {}".format(item))
-            
-            src_item = os.path.join(source_assets, item)
-            dst_item = os.path.join(target_assets, item)
-            
-            if os.path.isdir(src_item):
-                if os.path.exists(dst_item):
-                    shutil.rmtree(dst_item)
-                shutil.copytree(src_item, dst_item, ignore=ignore_patterns)
-                self.log_step("ASSETS_DIR", "Copied directory: {}".format(item))
-            else:
-                shutil.copy2(src_item, dst_item)
-                self.log_step("ASSETS_FILE", "Copied file: {}".format(item))
-        
-        self.log_step("ASSETS_COMPLETE", "Assets copied successfully")
+        link_mode = self.publish_config.get('assets', {}).get('link', 'reflink')
+        if link_mode not in LINK_MODES:
+            self.log_step("ASSETS_LINK_MODE", "Unknown link mode {}, copying files".format(link_mode))
+            link_mode = 'copy'
+        manifest_path = os.path.abspath(self.config.get('PATHS', 'asset_manifest', fallback=ASSET_MANIFEST))
+        
+        sync_start = time.time()
+        self.asset_stats = sync_tree(source_assets, target_assets, manifest_path, link_mode)
+        created = set(self.asset_stats.created_paths)
+        for path in self.asset_stats.copied_paths:
+            self.output_stats.note_change(path, 'created' if path in created else 'modified')
+        for path in self.asset_stats.deleted_paths:
+            self.output_stats.note_change(path, 'deleted')
+        for path in self.asset_stats.copied_paths:
+            self.log_step("ASSETS_FILE", "Updated: {}".format(os.path.relpath(path, target_assets)))
+        for path in self.asset_stats.deleted_paths:
+            self.log_step("ASSETS_DELETE", "Removed upstream: {}".format(os.path.relpath(path, target_assets)))
+        
+        self.tracer.annotate(files=len(self.asset_stats.copied_paths), skipped=self.asset_stats.skipped,
+                             bytes=self.asset_stats.bytes_copied, bytes_skipped=self.asset_stats.bytes_skipped,
+                             deleted=len(self.asset_stats.deleted_paths))
+        self.log_step("ASSETS_COMPLETE", "Assets synced in {:.1f}s: {}".format(
+            time.time() - sync_start, self.asset_stats.summary()))
     
-    def publish_binary(self, binary_info):
-        """Publish a single binary"""
+    def publish_binary(self, binary_info, built=None):
+        """Publish a single binary
+        
+        built is the result of a build that already ran on the worker pool,
+        or None to build the binary now.
+        """
         binary_name = binary_info['name']
         binary_start = time.time()
         
         self.log_step("BINARY_START", "Publishing {} ({})".format(binary_name, binary_info['display_name']))
         
         # Step 1: Build WASM
-        if not self.build_wasm(binary_name):
+        if built is None:
+            built = self.build_binary(binary_info)
+        if not built:
             self.log_step("BINARY_SKIP", "Skipping {}: Build failed".format(binary_name))
             return False
+        with self.tracer.span("size_check", binary=binary_name) as span:
+            if not self.check_size(binary_name):
+                span.fail("size budget exceeded")
+                self.log_step("BINARY_SKIP", "Skipping {}: Size budget exceeded".format(binary_name))
+                return False
+        
+        # Step 2: Copy WASM files first, so content.md never points at a missing entry
+        self.log_step("BINARY_COPY", "Copying WASM files for {}".format(binary_name))
+        project_dir = self.project_dir(binary_name)
+        os.makedirs(project_dir, exist_ok=True)
+        with self.tracer.span("copy", binary=binary_name):
+            manifest = self.copy_wasm_files(binary_name, project_dir)
         
-        # Step 2: Create project structure and load README
+        # Step 3: Create project structure and load README
         self.log_step("BINARY_STRUCTURE", "Creating project structure for {}".format(binary_name))
-        project_dir = self.create_project_structure(binary_info)
+        with self.tracer.span("structure", binary=binary_name):
+            self.create_project_structure(binary_info, manifest.get('app.js', 'app.js'))
         
-        # Step 3: Copy WASM files
-        self.log_step("BINARY_COPY", "Copying WASM files for {}".format(binary_name))
-        self.copy_wasm_files(binary_name, project_dir)
+        # Step 4: Remove artifacts of earlier publishes
+        with self.tracer.span("gc", binary=binary_name):
+            self.remove_stale_artifacts(binary_name, project_dir, manifest)
         
         binary_time = time.time() - binary_start
         self.log_step("BINARY_COMPLETE", "Successfully published {} in {:.1f}s".format(binary_name, binary_time))
         return True
     
-    def publish_all(self, specific_binary=None):
-        """Publish all binaries or a specific one"""
-        self.log_step("PUBLISH_START", "Starting automated publishing process")
+    def publish_all(self, specific_binary=None, jobs=1):
+        """Publish all binaries or a specific one in a traced run
         
-        # Try to load publish configuration first
-        specified_binaries = self.load_publish_config()
+        The trace is exported to the log directory even when publishing fails.
+        """
+        success = False
+        try:
+            with self.tracer.span("publish", binary=specific_binary or 'all', jobs=jobs, batch=self.batch) as span:
+                success = self.run_publish(specific_binary, jobs)
+                if not success:
+                    span.fail("publishing failed")
+        finally:
+            self.export_trace()
+            self.write_change_set()
+        return success
+    
+    def write_change_set(self):
+        """Write the paths created, modified and deleted in the target repository as JSON"""
+        change_set = self.output_stats.change_set(os.path.abspath(self.config['PATHS']['target_repo']))
+        write_change_set(self.changes_path, change_set)
+        self.log_step("CHANGE_SET", "{} created, {} modified, {} deleted, see {}".format(
+            len(change_set['created']), len(change_set['modified']), len(change_set['deleted']), self.changes_path))
+    
+    def export_trace(self):
+        """Write the spans of this run as JSON lines and as a Chrome trace-event file"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        jsonl_path = os.path.join(self.log_dir, 'publish_trace.jsonl')
+        chrome_path = os.path.join(self.log_dir, 'publish_trace.json')
+        self.tracer.export_jsonl(jsonl_path)
+        self.tracer.export_chrome(chrome_path)
+        self.log_step("TRACE", "{} spans written to {} and {} (chrome://tracing)".format(
+            len(self.tracer.spans), jsonl_path, chrome_path))
+    
+    def run_publish(self, specific_binary=None, jobs=1):
+        """Publish all binaries or a specific one
+        
+        With jobs > 1 all builds run concurrently first; project files are then
+        written in binary order, so the summary does not depend on build timing.
+        """
+        self.log_step("PUBLISH_START", "Starting automated publishing process")
         
-        # Parse Cargo.toml with or without binary filtering
-        binaries = self.parse_cargo_toml(specified_binaries)
+        with self.tracer.span("config"):
+            # Try to load publish configuration first
+            specified_binaries = self.load_publish_config()
+            
+            # Parse Cargo.toml with or without binary filtering
+            binaries = self.parse_cargo_toml(specified_binaries)
         
         # Handle specific binary request
         if specific_binary:
@@ -492,7 +1021,19 @@ tags = [{}]
             len(binaries), ', '.join([b['name'] for b in binaries])))
         
         # Copy assets first
-        self.copy_assets()
+        with self.tracer.span("assets"):
+            self.copy_assets()
+        
+        self.build_cache = self.create_build_cache()
+        self.blob_store = self.create_blob_store()
+        
+        build_results = {}
+        if self.batch:
+            with self.tracer.span("batch_build", binaries=len(binaries), jobs=jobs):
+                build_results = self.batch_build(binaries, jobs)
+        elif jobs > 1 and len(binaries) > 1:
+            with self.tracer.span("build_pool", binaries=len(binaries), jobs=min(jobs, len(binaries))):
+                build_results = self.build_all(binaries, min(jobs, len(binaries)))
         
         successful = 0
         failed = 0
@@ -503,7 +1044,11 @@ tags = [{}]
         for i, binary_info in enumerate(binaries, 1):
             self.log_progress(i, len(binaries), "Publishing: {}".format(binary_info['name']))
             
-            if self.publish_binary(binary_info):
+            with self.tracer.span("binary", binary=binary_info['name']) as span:
+                published = self.publish_binary(binary_info, build_results.get(binary_info['name']))
+                if not published:
+                    span.fail("publication failed")
+            if published:
                 successful += 1
                 self.log_step("PUBLISH_SUCCESS", "{} published successfully".format(binary_info['name']))
             else:
@@ -516,28 +1061,39 @@ tags = [{}]
         self.log_step("PUBLISH_COMPLETE", "Publishing completed in {:.1f}s".format(total_time))
         self.log_step("PUBLISH_STATS", "Successful: {} | Failed: {} | Total: {}".format(
             successful, failed, len(binaries)))
+        self.log_step("PUBLISH_OUTPUT", "Project files: {}".format(self.output_stats.summary()))
+        self.write_size_report()
+        if self.blob_store is not None:
+            projects_dir = os.path.join(self.config['PATHS']['target_repo'], 'content', 'projects')
+            with self.tracer.span("store_gc") as span:
+                removed = self.blob_store.collect_garbage(projects_dir)
+                span.set(deleted=len(removed), stored=self.blob_store.stored, reused=self.blob_store.reused)
+            for path in removed:
+                self.output_stats.note_change(path, 'deleted')
+                self.log_step("STORE_GC", "Removed unreferenced {}".format(os.path.basename(path)))
+            self.log_step("STORE_STATS", self.blob_store.summary())
+        if self.build_cache is not None:
+            self.log_step("BUILD_CACHE_STATS", self.build_cache.summary())
         
         if failed_binaries:
             self.log_step("PUBLISH_FAILURES", "Failed binaries: {}".format(', '.join(failed_binaries)))
         
+        self.tracer.annotate(binaries=len(binaries), successful=successful, failed=failed)
         return failed == 0
 
 def main():
     """Main entry point"""
-    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
-        print("""
-GitHub Auto Publisher for WASM Projects
-
-Usage: python3 github_auto_publisher.py [binary_name]
-
-Arguments:
-  binary_name    Optional, specify a single binary program name to publish
-  --help, -h     Show this help message
-
+    parser = argparse.ArgumentParser(
+        description="GitHub Auto Publisher for WASM Projects",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
 Configuration:
   Expects build_config.ini with [PATHS] section defining:
   - source_repo: Path to source repository
   - target_repo: Path to target repository
+  - log_dir: Optional, directory of per-binary build logs (default: build_logs)
+  - cache_dir: Optional, directory of the build artifact cache (default: .cache/wasm_build)
+  - asset_manifest: Optional, list of synced assets (default: .cache/asset_sync.json)
 
 Binary Selection:
   Create wasm_publish.toml in the source repository to specify which binaries to publish:
@@ -547,6 +1103,70 @@ Binary Selection:
   
   If wasm_publish.toml is not found, all binaries in Cargo.toml will be published.
 
+Build Cache:
+  A binary is rebuilt only when its source directory, the shared sources,
+  Cargo.toml, Cargo.lock, the toolchain, the build mode or its settings
+  changed: wasm/build_serve.sh without --batch, the [build] section with it.
+  Shared sources default to src/ and can be listed in wasm_publish.toml:
+  
+  [cache]
+  shared_paths = ["src", "crates"]
+
+Asset Sync:
+  assets/ is synced into static/assets/ of the target repository. Files with
+  the same size and mtime or content hash are skipped, files removed upstream
+  are deleted. Changed files are reflinked where supported, or hardlinked:
+  
+  [assets]
+  link = "reflink"       # or "hardlink", "copy"
+
+Fingerprinted Artifacts:
+  app.js and <name>_bg.wasm are stored once per unique content as
+  static/wasm_store/<hash>.js and <hash>.wasm, shared by all projects, so they
+  can be cached as immutable. Each project's wasm_manifest.json maps them to
+  their URLs, content.md loads the fingerprinted entry, and blobs no project
+  refers to are removed. To publish app.<hash>.js and <name>_bg.<hash>.wasm
+  into each project directory instead:
+  
+  [store]
+  enabled = false
+
+Batched Builds:
+  With --batch, all selected binaries are compiled by a single
+  cargo build --target wasm32-unknown-unknown invocation, then wasm-bindgen
+  runs per binary on --jobs workers. Optional settings in wasm_publish.toml:
+  
+  [build]
+  profile = "release"
+  cargo_args = ["--features", "webgl2"]
+  bindgen_args = ["--weak-refs"]
+  timeout = 600          # seconds before cargo is stopped
+
+Size Optimization:
+  Optionally run wasm-opt on every built module (debug sections are still
+  stripped when wasm-opt is not installed), and check the download size of
+  app.js plus the module against a budget. Sizes are written to
+  wasm_sizes.json in the log directory.
+  
+  [optimize]
+  enabled = true
+  wasm_opt_args = ["-Oz"]
+  strip_debug = true
+  
+  [size_budget]
+  metric = "gzip"        # or "raw"
+  on_exceed = "fail"     # or "warn"
+  default_kb = 4096
+  
+  [size_budget.binaries]
+  pattern_grid = 2048
+
+Tracing:
+  Every run writes its spans (publish -> binary -> build/copy/structure, with
+  attributes, status and log lines as events) to publish_trace.jsonl and
+  publish_trace.json in the log directory. The latter is a Chrome trace-event
+  file for chrome://tracing or https://ui.perfetto.dev.
+
 Tags Configuration:
   Tags can be specified in Cargo.toml metadata:
   
@@ -558,13 +1178,24 @@ Tags Configuration:
   or as comma-separated string:
   tags = "tag1, tag2, tag3"
         """)
-        return
+    parser.add_argument("binary_name", nargs="?",
+                        help="Optional, specify a single binary program name to publish")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="Number of binaries to build concurrently (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always run the build script instead of restoring cached artifacts")
+    parser.add_argument("--batch", action="store_true",
+                        help="Compile all binaries in one cargo invocation, then run wasm-bindgen per binary")
+    parser.add_argument("--changes", metavar="FILE",
+                        help="Path of the JSON change set of the target repository "
+                             "(default: publish_changes.json in the log directory)")
+    args = parser.parse_args()
     
     print("=" * 80)
     print("GitHub Auto Publisher for WASM Projects")
     print("=" * 80)
     
-    specific_binary = sys.argv[1] if len(sys.argv) > 1 else None
+    specific_binary = args.binary_name
     
     if specific_binary:
         print("Target Binary: {}".format(specific_binary))
@@ -574,8 +1205,8 @@ Tags Configuration:
     print("Start Time: {}".format(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
     print("-" * 80)
     
-    publisher = GitHubAutoPublisher()
-    success = publisher.publish_all(specific_binary)
+    publisher = GitHubAutoPublisher(use_cache=not args.no_cache, batch=args.batch, changes_path=args.changes)
+    success = publisher.publish_all(specific_binary, jobs=max(args.jobs, 1))
     
     print("-" * 80)
     print("Exit Code: {}".format(0 if success else 1))
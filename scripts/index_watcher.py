@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Filesystem watcher for generate_index_files.py --watch.
+Uses watchdog (inotify on Linux, FSEvents on macOS) when it is installed and
+falls back to polling file sizes and mtimes otherwise. Bursts of events are
+debounced and coalesced into a single regeneration call.
+"""
+
+import os
+import time
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+def is_relevant(path):
+    """Check whether a changed path can affect generated output"""
+    name = os.path.basename(path)
+    # Temporary files of atomic writes
+    if name.startswith(".") or name.endswith(".tmp"):
+        return False
+    # Directories have no extension; month directories may be created or removed
+    return name.endswith(".md") or not os.path.splitext(name)[1]
+
+class ChangeCollector:
+    def __init__(self):
+        """Initialize an empty set of pending changes"""
+        self.condition = threading.Condition()
+        self.paths = set()
+        self.last_event = 0.0
+
+    def add(self, path):
+        """Record a changed path"""
+        if not is_relevant(path):
+            return
+        with self.condition:
+            self.paths.add(path)
+            self.last_event = time.monotonic()
+            self.condition.notify()
+
+    def wait_batch(self, debounce):
+        """Block until changes arrived and no new event came in for debounce seconds"""
+        with self.condition:
+            while not self.paths:
+                self.condition.wait()
+            while True:
+                quiet = time.monotonic() - self.last_event
+                if quiet >= debounce:
+                    break
+                self.condition.wait(debounce - quiet)
+            paths, self.paths = self.paths, set()
+        return paths
+
+class WatchdogHandler(FileSystemEventHandler):
+    def __init__(self, collector):
+        """Forward watchdog events to a collector"""
+        super().__init__()
+        self.collector = collector
+
+    def on_any_event(self, event):
+        """Record source and destination paths of any event"""
+        if event.event_type in ("opened", "closed", "closed_no_write"):
+            return
+        self.collector.add(event.src_path)
+        if getattr(event, "dest_path", None):
+            self.collector.add(event.dest_path)
+
+def snapshot(content_dir):
+    """Return the size and mtime of every markdown file and directory"""
+    state = {}
+    for root, _, files in os.walk(content_dir):
+        state[root] = None
+        for file_name in files:
+            if file_name.endswith(".md"):
+                path = os.path.join(root, file_name)
+                try:
+                    stat_result = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                state[path] = (stat_result.st_size, stat_result.st_mtime_ns)
+    return state
+
+def poll_changes(content_dir, collector, interval, stop_event):
+    """Diff snapshots of the content directory and report changed paths"""
+    previous = snapshot(content_dir)
+    while not stop_event.wait(interval):
+        current = snapshot(content_dir)
+        for path in set(previous) | set(current):
+            if previous.get(path, False) != current.get(path, False):
+                collector.add(path)
+        previous = current
+
+def watch(content_dir, regenerate, debounce=0.5, poll_interval=2.0):
+    """Call regenerate(changed_paths) whenever files below content_dir change
+
+    Runs until interrupted with Ctrl+C.
+    """
+    collector = ChangeCollector()
+    stop_event = threading.Event()
+
+    if Observer is not None:
+        observer = Observer()
+        # The observer is not joined on exit, stopping it can block on pending inotify reads
+        observer.daemon = True
+        observer.schedule(WatchdogHandler(collector), content_dir, recursive=True)
+        observer.start()
+        print(f"Watching {content_dir} for changes...")
+    else:
+        poller = threading.Thread(target=poll_changes,
+                                  args=(content_dir, collector, poll_interval, stop_event),
+                                  daemon=True)
+        poller.start()
+        print(f"Watching {content_dir} for changes (polling every {poll_interval}s, install watchdog for native events)...")
+
+    try:
+        while True:
+            regenerate(collector.wait_batch(debounce))
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        stop_event.set()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+In-memory index of the PR documentation corpus.
+A single scan lists every directory once and records each PR markdown file
+by path, with its language versions paired by (directory, PR number); front
+matter generation and language pairing read from this index. Other files next to the documents, such as the
+pr_<n>.patch files the pages link to, are listed as attachments.
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+
+from generator_profile import PROFILER
+from pr_metadata import parse_pr_file_name
+
+# Looser pattern used to pair language versions of the same PR
+PR_LANGUAGE_PATTERN = re.compile(r'pr_(\d+)(?:_([a-z]{2}(?:-[a-z]{2})?))?_')
+# PR reference used to count unique PRs per section
+PR_NUMBER_PATTERN = re.compile(r'pr_(\d+)')
+# Month-level section directories (YYYY-MM)
+MONTH_DIR_PATTERN = re.compile(r'\d{4}-\d{2}')
+# Directory listings are only reused when the directory changed at least this long before the scan
+RACY_LISTING_NS = 2 * 10**9
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "zh-cn": "中文",
+    "fr": "Français",
+    # Add more languages as needed
+}
+
+def get_language_name(lang_code):
+    """Return the full name of a language based on its code"""
+    return LANGUAGE_NAMES.get(lang_code, lang_code)
+
+def is_month_dir(dir_path):
+    """Check whether a directory is a month-level section (YYYY-MM)"""
+    return MONTH_DIR_PATTERN.match(os.path.basename(dir_path)) is not None
+
+class PRFile:
+    """A PR markdown file and the metadata derived from it"""
+    __slots__ = ("path", "rel_path", "dir_path", "file_name", "pr_number", "language",
+                 "date_str", "pair_key", "pr_ref", "stat")
+
+    def __init__(self, content_dir, dir_path, file_name, stat_result):
+        self.path = os.path.join(dir_path, file_name)
+        self.rel_path = os.path.relpath(self.path, content_dir).replace(os.sep, '/')
+        self.dir_path = dir_path
+        self.file_name = file_name
+        self.stat = stat_result
+
+        self.pr_number, self.language, self.date_str = parse_pr_file_name(file_name)
+
+        match = PR_LANGUAGE_PATTERN.search(file_name)
+        self.pair_key = (match.group(1), match.group(2) or "en") if match else None
+
+        match = PR_NUMBER_PATTERN.search(file_name)
+        self.pr_ref = match.group(1) if match else None
+
+    @property
+    def month(self):
+        """Directory of the file relative to the content root"""
+        return os.path.dirname(self.rel_path)
+
+class PRCorpusIndex:
+    def __init__(self, content_dir):
+        """Initialize an empty index rooted at the content directory"""
+        self.content_dir = os.path.normpath(content_dir)
+        # Directory path -> sorted subdirectory paths
+        self.subdirs = OrderedDict()
+        # Relative path -> PRFile
+        self.files = OrderedDict()
+        # Relative path -> (path, stat result) of non-Markdown files, e.g. pr_<n>.patch
+        self.attachments = OrderedDict()
+        # Directory path -> PRFiles directly inside it
+        self.dir_files = {}
+        # (directory, PR number) -> language code -> PRFile, sorted by language
+        self.pairs = {}
+        self._language_cache = {}
+        # Directory path -> (mtime, subdirectory names, file names), reused by the next scan
+        self.listings = {}
+        self.listed_at = None
+
+    def scan(self, previous=None):
+        """List every directory once and register all PR markdown files
+
+        With the index of an earlier scan, a directory whose mtime did not change
+        is not listed again and the PRFiles of unchanged paths are reused, so only
+        the files themselves are stat'ed. The order is the one of os.walk.
+        """
+        self.listed_at = int(time.time() * 10**9)
+        stack = [self.content_dir]
+        while stack:
+            root = stack.pop()
+            listing = self.list_dir(root, previous)
+            if listing is None:
+                continue
+            _, dirs, files = listing
+            self.subdirs[root] = [os.path.join(root, d) for d in dirs]
+            # Like os.walk, symlinked directories are listed but not descended into
+            stack.extend(reversed([path for path in self.subdirs[root] if not os.path.islink(path)]))
+
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                if not file_name.endswith(".md"):
+                    # Hidden files include the temporary files of atomic writes
+                    if not file_name.startswith("."):
+                        rel_path = os.path.relpath(path, self.content_dir).replace(os.sep, '/')
+                        self.attachments[rel_path] = (path, os.stat(path))
+                    continue
+                if file_name == "_index.md":
+                    continue
+                stat_result = os.stat(path)
+                pr_file = previous.files.get(os.path.relpath(path, self.content_dir).replace(os.sep, '/')) \
+                    if previous is not None else None
+                if pr_file is None:
+                    pr_file = PRFile(self.content_dir, root, file_name, stat_result)
+                else:
+                    pr_file.stat = stat_result
+                self.add(pr_file)
+
+        # Sort language versions by code to keep a consistent order across platforms
+        for key, versions in self.pairs.items():
+            self.pairs[key] = OrderedDict(sorted(versions.items(), key=lambda item: item[0]))
+        return self
+
+    def list_dir(self, dir_path, previous=None):
+        """Return (mtime, sorted subdirectory names, sorted file names) of a directory, or None if unreadable"""
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None
+        listing = previous.listings.get(dir_path) if previous is not None else None
+        # A listing taken within the mtime granularity of a change may have missed it
+        if listing is None or listing[0] != mtime or previous.listed_at - mtime < RACY_LISTING_NS:
+            dirs, files = [], []
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        (dirs if is_dir else files).append(entry.name)
+            except OSError:
+                return None
+            listing = (mtime, sorted(dirs), sorted(files))
+            PROFILER.count("dirs_listed")
+        else:
+            PROFILER.count("dirs_reused")
+        self.listings[dir_path] = listing
+        return listing
+
+    def add(self, pr_file):
+        """Register a file in the index"""
+        self.files[pr_file.rel_path] = pr_file
+        self.dir_files.setdefault(pr_file.dir_path, []).append(pr_file)
+        if pr_file.pair_key:
+            pr_number, lang_code = pr_file.pair_key
+            # Later duplicates (e.g. pr_1_en_20250101_1.md) win, as file names are sorted
+            self.pairs.setdefault((pr_file.dir_path, pr_number), {})[lang_code] = pr_file
+
+    @PROFILER.timed("language_pairing")
+    def language_versions(self, pr_file):
+        """Return all language versions of a PR as an ordered dictionary"""
+        if not pr_file.pr_number:
+            return OrderedDict()
+
+        key = (pr_file.dir_path, pr_file.pr_number)
+        if key in self._language_cache:
+            return self._language_cache[key]
+
+        available_languages = OrderedDict()
+        for lang_code, version in self.pairs.get(key, {}).items():
+            # Replace underscores with hyphens to match Zola's URL generation rules
+            # Do not include .html suffix as Zola generates clean URLs
+            file_name_with_hyphens = os.path.splitext(version.file_name)[0].replace('_', '-')
+            rel_dir_path = os.path.relpath(version.dir_path, self.content_dir)
+            url = f"/pull_request/{rel_dir_path}/{file_name_with_hyphens}".replace(os.sep, '/')
+            available_languages[lang_code] = {
+                "name": get_language_name(lang_code),
+                "url": url
+            }
+
+        self._language_cache[key] = available_languages
+        return available_languages
+
+    def language_signature(self, pr_file):
+        """Return the language versions of a file in a JSON-friendly form"""
+        return [[lang, info["url"]] for lang, info in self.language_versions(pr_file).items()]
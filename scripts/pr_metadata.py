@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Metadata extractor for PR markdown documents.
+All patterns are compiled once at import. The document header (everything up
+to the end of the "## Basic Information" block) is located once, and the
+Title and Labels fields are only searched within that block, so
+read_pr_header() only needs to load the first few KB of each file. Title
+headings are searched in all of the text read; when none is found in the
+header, the caller reads the whole file.
+"""
+
+import re
+from collections import namedtuple
+
+# pr_18143_zh-cn_20250303.md or pr_18143_zh-cn_20250303_215251.md
+PR_FILE_PATTERN = re.compile(r'pr_(\d+)(?:_([a-z]{2}(?:-[a-z]{2})?))?_(\d{8})(?:_\d{6})?')
+
+# Existing TOML front matter at the start of a document
+FRONT_MATTER_PATTERN = re.compile(r'\+\+\+(.*?)\+\+\+', re.DOTALL)
+
+BASIC_INFO_HEADING = "## Basic Information"
+# The Basic Information block ends at the next "##"
+BASIC_INFO_END = "##"
+BASIC_INFO_HEADING_BYTES = BASIC_INFO_HEADING.encode("utf-8")
+BASIC_INFO_END_BYTES = BASIC_INFO_END.encode("utf-8")
+
+# Title patterns in order of preference
+TITLE_HEADING_PATTERN = re.compile(r'# Title: (.*?)(?:\r?\n)')
+TITLE_FIELD_PATTERN = re.compile(r'\*\*Title\*\*: (.*?)(?:\r?\n)')
+TITLE_ZH_FIELD_PATTERN = re.compile(r'\*\*标题\*\*:\s*`?(.*?)`?(?:\r?\n|\*\*)')
+LABELS_FIELD_PATTERN = re.compile(r'\*\*Labels\*\*:\s*(.*?)(?:\r?\n|$)')
+
+# Initial chunk size of header reads, doubled while the header is incomplete
+HEADER_CHUNK_SIZE = 4096
+
+# text is the decoded header, size the number of bytes it spans in the file and
+# complete is True when the whole file was read
+PRHeader = namedtuple("PRHeader", ["text", "size", "complete"])
+
+# pr_number, language and date come from the file name, title and labels from the header.
+# title is None when no title pattern matched, date is formatted for front matter.
+PRMetadata = namedtuple("PRMetadata", ["pr_number", "title", "labels", "language", "date"])
+
+def parse_pr_file_name(file_name):
+    """Return (pr_number, language, YYYYMMDD date) from a PR file name, or Nones"""
+    match = PR_FILE_PATTERN.search(file_name)
+    if not match:
+        return None, "en", None
+    return match.group(1), match.group(2) or "en", match.group(3)
+
+def find_basic_information(content):
+    """Return the (start, end) span of the Basic Information block content, or None"""
+    heading = content.find(BASIC_INFO_HEADING)
+    if heading < 0:
+        return None
+
+    start = heading + len(BASIC_INFO_HEADING)
+    end = content.find(BASIC_INFO_END, start)
+    return start, end if end >= 0 else len(content)
+
+def header_end(data):
+    """Return the byte offset where the header of a document ends, or -1 if it is not complete yet
+
+    The header spans any leading front matter and the Basic Information block.
+    All markers are ASCII, so the offset is always a valid UTF-8 boundary.
+    """
+    start = 0
+    if data.startswith(b"+++"):
+        front_matter_end = data.find(b"+++", 3)
+        if front_matter_end < 0:
+            return -1
+        start = front_matter_end + 3
+
+    heading = data.find(BASIC_INFO_HEADING_BYTES, start)
+    if heading < 0:
+        return -1
+    return data.find(BASIC_INFO_END_BYTES, heading + len(BASIC_INFO_HEADING_BYTES))
+
+def read_pr_header(file_path, full=False):
+    """Read a PR document only up to the end of its Basic Information block
+
+    Documents without such a block are read completely, as is any document when full is set.
+    """
+    with open(file_path, "rb") as f:
+        if full:
+            data = f.read()
+            return PRHeader(data.decode("utf-8"), len(data), True)
+
+        data = b""
+        chunk_size = HEADER_CHUNK_SIZE
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return PRHeader(data.decode("utf-8"), len(data), True)
+
+            data += chunk
+            end = header_end(data)
+            if end >= 0:
+                return PRHeader(data[:end].decode("utf-8"), end, False)
+            chunk_size *= 2
+
+def parse_labels(content, block):
+    """Parse the Labels field of a Basic Information block span"""
+    if block is None:
+        return []
+
+    labels_match = LABELS_FIELD_PATTERN.search(content, block[0], block[1])
+    if not labels_match:
+        return []
+
+    labels_str = labels_match.group(1).strip()
+    # Check if labels are "None" or empty
+    if labels_str.lower() == "none" or not labels_str:
+        return []
+    # Split by comma, strip whitespace and remove backtick characters
+    return [label.strip().replace('`', '') for label in labels_str.split(',')]
+
+def parse_title(content, block):
+    """Find the PR title of a document"""
+    # Pattern 1: "# Title: XXX" at the beginning of the document
+    title_match = TITLE_HEADING_PATTERN.search(content)
+
+    # Pattern 2: "**Title**: XXX" in the Basic Information section
+    if not title_match and block is not None:
+        title_match = TITLE_FIELD_PATTERN.search(content, block[0], block[1])
+
+    # Pattern 3: "**标题**: XXX" in Chinese docs
+    if not title_match:
+        title_match = TITLE_ZH_FIELD_PATTERN.search(content)
+
+    return title_match.group(1).strip() if title_match else None
+
+def extract_pr_metadata(content, file_name):
+    """Extract PR metadata from a document or from its header"""
+    pr_number, language, date_str = parse_pr_file_name(file_name)
+
+    block = find_basic_information(content)
+
+    date = None
+    if date_str:
+        # Format date (YYYYMMDD -> YYYY-MM-DDT00:00:00)
+        date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}T00:00:00"
+
+    return PRMetadata(
+        pr_number=pr_number,
+        title=parse_title(content, block),
+        labels=parse_labels(content, block),
+        language=language,
+        date=date
+    )
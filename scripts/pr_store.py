@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite store of PR corpus metadata for generate_index_files.py.
+Records size, mtime, content hash, language versions and derived metadata
+(title, labels, language, date, month) of every processed PR markdown file.
+Rows are upserted by path as files are processed, so later runs only reparse
+files whose inputs changed, and section label rollups are database queries.
+The size and mtime of attachments (non-Markdown files such as patches) are
+recorded as well, so their changes end up in the change set.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+
+# Bump when the generated front matter format or the schema changes to force a full rewrite
+STORE_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    month TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    pr_number TEXT,
+    pr_ref TEXT,
+    title TEXT,
+    language TEXT,
+    date TEXT,
+    languages TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (path, position)
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_month ON files (month);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE INDEX IF NOT EXISTS files_pr ON files (pr_number);
+CREATE INDEX IF NOT EXISTS labels_label ON labels (label);
+"""
+
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PRMetadataStore:
+    def __init__(self, store_path, settings=None):
+        """Initialize a store bound to a database path and generator settings"""
+        self.store_path = store_path
+        self.settings = settings or {}
+        self.connection = None
+        # Relative path -> file state, mirrors the files table for fast change checks
+        self.files = {}
+        # Relative path -> (size, mtime_ns), mirrors the attachments table
+        self.attachments = {}
+
+    def connect(self):
+        """Open the database and create missing tables"""
+        if self.connection is None:
+            store_dir = os.path.dirname(self.store_path)
+            if store_dir:
+                os.makedirs(store_dir, exist_ok=True)
+            self.connection = sqlite3.connect(self.store_path)
+            self.connection.executescript(SCHEMA)
+        return self.connection
+
+    def close(self):
+        """Close the database connection"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def load(self):
+        """Load recorded file states, returns False if the store is new or stale
+
+        A stale store (different version or label filter) is emptied.
+        """
+        connection = self.connect()
+        meta = dict(connection.execute("SELECT key, value FROM meta"))
+        settings = json.dumps(self.settings, sort_keys=True)
+        if meta.get("version") == str(STORE_VERSION) and meta.get("settings") == settings:
+            self.files = {
+                path: {"size": size, "mtime_ns": mtime_ns, "sha256": sha256, "languages": json.loads(languages)}
+                for path, size, mtime_ns, sha256, languages in connection.execute(
+                    "SELECT path, size, mtime_ns, sha256, languages FROM files")
+            }
+            self.attachments = {path: (size, mtime_ns) for path, size, mtime_ns in connection.execute(
+                "SELECT path, size, mtime_ns FROM attachments")}
+            return True
+
+        with connection:
+            connection.execute("DELETE FROM files")
+            connection.execute("DELETE FROM labels")
+            connection.execute("DELETE FROM attachments")
+            connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                   [("version", str(STORE_VERSION)), ("settings", settings)])
+        self.files = {}
+        self.attachments = {}
+        return False
+
+    def save(self):
+        """Commit all pending upserts and removals"""
+        self.connect().commit()
+
+    def get(self, rel_path):
+        """Return the recorded state (size, mtime, hash and language versions) of a file, or None"""
+        return self.files.get(rel_path)
+
+    def metadata(self, rel_path):
+        """Return the derived metadata of a file as generate_index_files.py renders it"""
+        connection = self.connect()
+        row = connection.execute("SELECT pr_number, language, date, title FROM files WHERE path = ?",
+                                 (rel_path,)).fetchone()
+        if row is None:
+            return None
+
+        labels = [label for (label,) in connection.execute(
+            "SELECT label FROM labels WHERE path = ? ORDER BY position", (rel_path,))]
+        pr_number, language, date, title = row
+        if pr_number is None:
+            return {"labels": labels}
+        return {"pr_number": pr_number, "language": language, "date": date, "title": title, "labels": labels}
+
+    def paths(self):
+        """Return all recorded relative paths"""
+        return list(self.files.keys())
+
+    def remove(self, rel_path):
+        """Forget a file that no longer exists"""
+        self.files.pop(rel_path, None)
+        connection = self.connect()
+        connection.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+        connection.execute("DELETE FROM labels WHERE path = ?", (rel_path,))
+
+    def is_unchanged(self, rel_path, file_path, stat_result):
+        """Check whether a file still matches its recorded size, mtime and hash"""
+        entry = self.files.get(rel_path)
+        if entry is None:
+            return False
+
+        if entry["size"] == stat_result.st_size and entry["mtime_ns"] == stat_result.st_mtime_ns:
+            return True
+
+        # Size or mtime differ (e.g. touched or copied), fall back to the content hash
+        if entry["size"] != stat_result.st_size or entry["sha256"] is None:
+            return False
+        if entry["sha256"] != file_digest(file_path):
+            return False
+
+        entry["mtime_ns"] = stat_result.st_mtime_ns
+        self.connect().execute("UPDATE files SET mtime_ns = ? WHERE path = ?",
+                               (stat_result.st_mtime_ns, rel_path))
+        return True
+
+    def record(self, pr_file, metadata, languages, digest=None):
+        """Upsert the on-disk state and metadata of a file right after it was processed
+
+        Pass the digest of the bytes just written; files that were left untouched
+        are recorded without a digest instead of being read back.
+        """
+        stat_result = os.stat(pr_file.path)
+        rel_path = pr_file.rel_path
+        month = pr_file.month
+        self.files[rel_path] = {
+            "size": stat_result.st_size,
+            "mtime_ns": stat_result.st_mtime_ns,
+            "sha256": digest,
+            "languages": languages,
+        }
+
+        connection = self.connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO files (path, month, parent, size, mtime_ns, sha256, pr_number, pr_ref,"
+            " title, language, date, languages) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (rel_path, month, os.path.dirname(month), stat_result.st_size, stat_result.st_mtime_ns,
+             digest, metadata.get("pr_number"), pr_file.pr_ref, metadata.get("title"),
+             metadata.get("language"), metadata.get("date"), json.dumps(languages, ensure_ascii=False)))
+        connection.execute("DELETE FROM labels WHERE path = ?", (rel_path,))
+        connection.executemany("INSERT INTO labels (path, position, label) VALUES (?, ?, ?)",
+                               [(rel_path, position, label) for position, label in enumerate(metadata["labels"])])
+
+    def attachment_state(self, rel_path):
+        """Return the recorded (size, mtime_ns) of an attachment, or None"""
+        return self.attachments.get(rel_path)
+
+    def attachment_paths(self):
+        """Return all recorded attachment paths"""
+        return list(self.attachments.keys())
+
+    def record_attachment(self, rel_path, stat_result):
+        """Upsert the size and mtime of an attachment"""
+        self.attachments[rel_path] = (stat_result.st_size, stat_result.st_mtime_ns)
+        self.connect().execute("INSERT OR REPLACE INTO attachments (path, size, mtime_ns) VALUES (?, ?, ?)",
+                               (rel_path, stat_result.st_size, stat_result.st_mtime_ns))
+
+    def remove_attachment(self, rel_path):
+        """Forget an attachment that no longer exists"""
+        self.attachments.pop(rel_path, None)
+        self.connect().execute("DELETE FROM attachments WHERE path = ?", (rel_path,))
+
+    def section_summary(self, rel_dir):
+        """Return the label set and unique PR numbers of a section
+
+        A section covers files directly inside it and in its direct subdirectories.
+        """
+        connection = self.connect()
+        all_labels = {label for (label,) in connection.execute(
+            "SELECT DISTINCT labels.label FROM labels JOIN files ON files.path = labels.path"
+            " WHERE files.month = ? OR files.parent = ?", (rel_dir, rel_dir))}
+        unique_prs = {pr_ref for (pr_ref,) in connection.execute(
+            "SELECT DISTINCT pr_ref FROM files WHERE (month = ? OR parent = ?) AND pr_ref IS NOT NULL",
+            (rel_dir, rel_dir))}
+        return all_labels, unique_prs
+
+    def prs_by_label(self, label):
+        """Return (path, title) of files carrying a label"""
+        return self.connect().execute(
+            "SELECT files.path, files.title FROM files JOIN labels ON labels.path = files.path"
+            " WHERE labels.label = ? ORDER BY files.path", (label,)).fetchall()
+
+    def prs_by_month(self, month):
+        """Return (path, title) of files in a month, given as YYYY-MM or repo/YYYY-MM"""
+        return self.connect().execute(
+            "SELECT path, title FROM files WHERE month = ? OR month LIKE ? ORDER BY path",
+            (month, "%/" + month)).fetchall()
+
+    def missing_translation(self, language):
+        """Return (month, PR number, title) of PRs without a version in the given language"""
+        return self.connect().execute(
+            "SELECT month, pr_number, MIN(title) FROM files WHERE pr_number IS NOT NULL"
+            " GROUP BY month, pr_number HAVING SUM(language = ?) = 0 ORDER BY month, pr_number",
+            (language,)).fetchall()
+
+    def label_counts(self):
+        """Return (label, number of files) pairs, most used first"""
+        return self.connect().execute(
+            "SELECT label, COUNT(*) FROM labels GROUP BY label ORDER BY COUNT(*) DESC, label").fetchall()
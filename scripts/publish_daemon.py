@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Resident daemon mode for publish.py.
+The generator runs in-process with its modules imported, config.toml parsed
+and the SQLite metadata store open, so a cycle only pays for the files that
+changed. The corpus index of the last cycle is kept as well, directories
+unchanged since then are not listed again, only their files are stat'ed. Cycles run on an optional interval and on demand: a "publish"
+written to a local Unix socket queues a cycle. Triggers arriving within the
+settle window, or while a cycle runs, are coalesced into a single follow-up
+cycle.
+"""
+
+import os
+import json
+import time
+import socket
+import signal
+import threading
+from datetime import datetime
+
+import generate_index_files as generator
+from pr_store import PRMetadataStore
+
+# Seconds without new triggers before a queued cycle starts
+SETTLE_SECONDS = 2.0
+# Longest a queued cycle is delayed by a steady stream of triggers
+MAX_SETTLE_SECONDS = 30.0
+# Seconds a client waits for the daemon to answer
+CLIENT_TIMEOUT = 5.0
+
+class WarmGenerator:
+    def __init__(self, jobs=None):
+        """Keep the metadata store open and the corpus index of the last cycle for all cycles"""
+        self.jobs = jobs or os.cpu_count() or 1
+        self.store = None
+        # Directories unchanged since the last cycle are not listed again
+        self.index = None
+        self.loaded = False
+        self.config_mtime = None
+
+    def refresh(self):
+        """Reload the label filter and reopen the store when config.toml changed"""
+        try:
+            config_mtime = os.stat(generator.CONFIG_FILE).st_mtime_ns
+        except OSError:
+            config_mtime = None
+        if self.store is not None and config_mtime == self.config_mtime:
+            return
+
+        if self.store is not None:
+            print("config.toml changed, reloading the label filter")
+            generator.FILTERED_LABELS = generator.load_filtered_labels()
+            self.store.close()
+        self.config_mtime = config_mtime
+        self.store = PRMetadataStore(generator.STORE_FILE, {"filtered_labels": generator.FILTERED_LABELS})
+        # A stale or missing store makes the next cycle a full one
+        self.loaded = self.store.load()
+
+    def __call__(self, changes_path, profile_path):
+        """Run one generation pass on the open store, returns its GenerateResult"""
+        self.refresh()
+        options = generator.GenerateOptions(full=not self.loaded, jobs=self.jobs, store=self.store,
+                                            changes=changes_path, profile=profile_path, index=self.index)
+        result = generator.generate(generator.CONTENT_DIR, options)
+        self.index = result.index
+        # A failed pass may have left the store half-updated, the next one rechecks every file
+        self.loaded = not result.errors
+        return result
+
+    def close(self):
+        """Close the metadata store"""
+        if self.store is not None:
+            self.store.close()
+
+class PublishDaemon:
+    def __init__(self, run_cycle, socket_path, interval_seconds=None, settle_seconds=SETTLE_SECONDS):
+        """Initialize a daemon calling run_cycle(force) for every cycle"""
+        self.run_cycle = run_cycle
+        self.socket_path = socket_path
+        self.interval_seconds = interval_seconds
+        self.settle_seconds = settle_seconds
+        # Set by triggers, cleared when a cycle picks them up
+        self.triggered = threading.Event()
+        self.force = False
+        self.last_trigger = 0.0
+        self.first_trigger = None
+        self.stopping = threading.Event()
+        # Guards the trigger state and the status shared with the socket thread
+        self.state_lock = threading.Lock()
+        self.running = False
+        self.cycles = 0
+        self.triggers = 0
+        self.last_result = None
+        self.last_finished = None
+        self.server = None
+
+    def trigger(self, force=False):
+        """Queue a cycle, coalescing it with any cycle already queued"""
+        with self.state_lock:
+            now = time.time()
+            self.triggers += 1
+            self.last_trigger = now
+            if self.first_trigger is None:
+                self.first_trigger = now
+            self.force = self.force or force
+            self.triggered.set()
+
+    def status(self):
+        """Return the daemon state as plain data"""
+        with self.state_lock:
+            return {
+                "pid": os.getpid(),
+                "running": self.running,
+                "queued": self.triggered.is_set(),
+                "cycles": self.cycles,
+                "triggers": self.triggers,
+                "last_result": self.last_result,
+                "last_finished": self.last_finished,
+                "interval_seconds": self.interval_seconds,
+            }
+
+    def handle_client(self, connection):
+        """Answer one request on the socket: publish, force or status"""
+        with connection:
+            connection.settimeout(CLIENT_TIMEOUT)
+            try:
+                command = connection.recv(1024).decode("utf-8", "replace").strip() or "publish"
+            except OSError:
+                return
+            if command in ("publish", "force"):
+                self.trigger(force=command == "force")
+                reply = {"queued": True, "running": self.status()["running"]}
+            elif command == "status":
+                reply = self.status()
+            else:
+                reply = {"error": f"unknown command {command!r}, expected publish, force or status"}
+            try:
+                connection.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+            except OSError:
+                pass
+
+    def listen(self):
+        """Bind the socket, replacing a stale one left behind by a crashed daemon"""
+        if os.path.exists(self.socket_path):
+            if send_command(self.socket_path, "status") is not None:
+                raise RuntimeError(f"A publish daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(8)
+
+        def accept_loop():
+            while not self.stopping.is_set():
+                try:
+                    connection, _ = self.server.accept()
+                except OSError:
+                    break
+                self.handle_client(connection)
+
+        threading.Thread(target=accept_loop, name="publish-trigger", daemon=True).start()
+
+    def wait_for_cycle(self):
+        """Block until a cycle is due, returns whether to force it, or None when stopping"""
+        deadline = time.time() + self.interval_seconds if self.interval_seconds else None
+        while not self.stopping.is_set():
+            timeout = max(deadline - time.time(), 0) if deadline else None
+            if not self.triggered.wait(timeout if timeout is None else min(timeout, 1.0)):
+                if deadline and time.time() >= deadline:
+                    return False
+                continue
+
+            # Let a burst of triggers settle into one cycle
+            while not self.stopping.is_set():
+                with self.state_lock:
+                    quiet_for = time.time() - self.last_trigger
+                    waited = time.time() - self.first_trigger
+                    if quiet_for >= self.settle_seconds or waited >= MAX_SETTLE_SECONDS:
+                        force = self.force
+                        self.force = False
+                        self.first_trigger = None
+                        self.triggered.clear()
+                        return force
+                time.sleep(min(self.settle_seconds - quiet_for, 0.2) if quiet_for < self.settle_seconds else 0.05)
+        return None
+
+    def stop(self, *args):
+        """Stop after the current cycle"""
+        self.stopping.set()
+        self.triggered.set()
+
+    def serve(self):
+        """Run cycles until SIGINT or SIGTERM"""
+        self.listen()
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        schedule = f"every {self.interval_seconds / 3600:g} hours and " if self.interval_seconds else ""
+        print(f"Publish daemon {os.getpid()} running {schedule}on demand, trigger with: "
+              f"python3 publish.py --trigger (socket {self.socket_path})")
+        try:
+            while True:
+                force = self.wait_for_cycle()
+                if force is None:
+                    break
+                with self.state_lock:
+                    self.running = True
+                try:
+                    result = self.run_cycle(force)
+                except Exception as e:
+                    print(f"Error: Publish cycle failed: {e}")
+                    result = 1
+                with self.state_lock:
+                    self.running = False
+                    self.cycles += 1
+                    self.last_result = result
+                    self.last_finished = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        finally:
+            self.server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            print("Publish daemon stopped.")
+
+def send_command(socket_path, command="publish", timeout=CLIENT_TIMEOUT):
+    """Send a command to a running daemon, returns its reply or None if no daemon is listening"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            client.sendall(command.encode("utf-8") + b"\n")
+            client.shutdown(socket.SHUT_WR)
+            data = b""
+            for chunk in iter(lambda: client.recv(4096), b""):
+                data += chunk
+    except OSError:
+        return None
+    try:
+        return json.loads(data.decode("utf-8"))
+    except ValueError:
+        return None
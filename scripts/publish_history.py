@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Run history for publish.py.
+Every cycle appends one JSON line with its outcome, per-phase durations
+(fingerprint, generator, git status/add/commit/push), generator counts, the
+size of the staged files and the lines the commit changes. The report
+summarizes the last runs with percentiles, the trend between the older and
+newer half, and flags runs that took much longer than the runs before them,
+so a slowdown as the PR archive grows shows up before it hurts.
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+from contextlib import contextmanager
+
+# Runs summarized by the report by default
+REPORT_RUNS = 50
+# A run is flagged when a metric exceeds this multiple of the median of the runs before it
+REGRESSION_FACTOR = 1.5
+# Number of earlier runs the median of a regression check is taken over
+REGRESSION_WINDOW = 20
+# Earlier runs needed before a run can be flagged
+REGRESSION_MIN_RUNS = 5
+# Metrics of the report: key, label, unit
+METRICS = [
+    ("total_seconds", "total", "s"),
+    ("fingerprint_seconds", "fingerprint", "s"),
+    ("generator_seconds", "generator", "s"),
+    ("git_status_seconds", "git status", "s"),
+    ("git_add_seconds", "git add", "s"),
+    ("git_commit_seconds", "git commit", "s"),
+    ("git_push_seconds", "git push", "s"),
+    ("files_scanned", "files scanned", ""),
+    ("files_rewritten", "files rewritten", ""),
+    ("paths_changed", "paths changed", ""),
+    ("bytes_staged", "bytes staged", "B"),
+    ("lines_changed", "lines changed", ""),
+]
+# Metrics checked for regressions
+REGRESSION_METRICS = ["total_seconds", "generator_seconds", "git_push_seconds"]
+
+class RunRecord:
+    def __init__(self):
+        """Start recording a run now"""
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.fields = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of code as <name>_seconds, adding up repeated phases"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = name + "_seconds"
+            self.fields[key] = round(self.fields.get(key, 0.0) + time.perf_counter() - start, 6)
+
+    def set(self, **fields):
+        """Add or overwrite fields"""
+        self.fields.update(fields)
+
+    def finish(self, status):
+        """Return the finished run as plain data"""
+        record = {
+            "started_at": datetime.fromtimestamp(self.started).strftime("%Y-%m-%d %H:%M:%S"),
+            "status": status,
+            "total_seconds": round(time.perf_counter() - self.start, 6),
+        }
+        record.update(self.fields)
+        if status != 0:
+            record["outcome"] = "failed"
+        return record
+
+def append_record(history_path, record):
+    """Append a run to the history file"""
+    os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+def load_records(history_path, limit=None):
+    """Return the last limit runs of the history file, oldest first, skipping unreadable lines"""
+    records = []
+    try:
+        with open(history_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return []
+    return records[-limit:] if limit else records
+
+def percentile(values, q):
+    """Return the q-th percentile of values with linear interpolation"""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def metric_values(records, key):
+    """Return the values of a metric over the runs that did the work it measures"""
+    # Skipped runs only fingerprint, their totals would hide the cost of real cycles
+    return [record[key] for record in records
+            if record.get(key) is not None and (record.get("outcome") != "skipped" or key == "fingerprint_seconds")]
+
+def trend(values):
+    """Return the change of the median from the older to the newer half in percent, or None"""
+    if len(values) < 4:
+        return None
+    half = len(values) // 2
+    older, newer = percentile(values[:half], 50), percentile(values[-half:], 50)
+    if not older:
+        return None
+    return (newer - older) / older * 100
+
+def find_regressions(records, factor=REGRESSION_FACTOR, window=REGRESSION_WINDOW):
+    """Return (record, key, value, baseline) for metrics exceeding factor times the median of earlier runs"""
+    regressions = []
+    for key in REGRESSION_METRICS:
+        history = []
+        for record in records:
+            if record.get("outcome") == "skipped" or record.get(key) is None:
+                continue
+            value = record[key]
+            recent = history[-window:]
+            if len(recent) >= REGRESSION_MIN_RUNS:
+                baseline = percentile(recent, 50)
+                if baseline and value > baseline * factor:
+                    regressions.append((record, key, value, baseline))
+            history.append(value)
+    regressions.sort(key=lambda regression: regression[0].get("started_at", ""))
+    return regressions
+
+def format_value(value, unit):
+    """Format a metric value for the report"""
+    if value is None:
+        return "-"
+    if unit == "s":
+        return f"{value:.2f}s"
+    if unit == "B":
+        return f"{value / 1024:.1f}KB"
+    return f"{value:.0f}"
+
+def render_report(records, factor=REGRESSION_FACTOR):
+    """Return the report over records as text"""
+    if not records:
+        return "No publish runs recorded yet."
+
+    outcomes = {}
+    for record in records:
+        outcomes[record.get("outcome", "unknown")] = outcomes.get(record.get("outcome", "unknown"), 0) + 1
+    lines = [
+        f"Publish history: {len(records)} runs from {records[0].get('started_at')} to {records[-1].get('started_at')}",
+        "Outcomes: " + ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())),
+        "",
+        f"{'metric':<16} {'runs':>5} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10} {'trend':>8}",
+    ]
+    for key, label, unit in METRICS:
+        values = metric_values(records, key)
+        if not values:
+            continue
+        change = trend(values)
+        lines.append(f"{label:<16} {len(values):>5} "
+                     + " ".join(f"{format_value(percentile(values, q), unit):>10}" for q in (50, 90, 99))
+                     + f" {format_value(max(values), unit):>10} "
+                     + f"{'-' if change is None else f'{change:+.0f}%':>8}")
+
+    regressions = find_regressions(records, factor)
+    lines.append("")
+    if regressions:
+        lines.append(f"Regressions (over {factor:g}x the median of the previous {REGRESSION_WINDOW} runs):")
+        labels = {key: (label, unit) for key, label, unit in METRICS}
+        for record, key, value, baseline in regressions:
+            label, unit = labels[key]
+            lines.append(f"  {record.get('started_at')} {label}: {format_value(value, unit)} "
+                         f"vs median {format_value(baseline, unit)} ({value / baseline:.1f}x)")
+    else:
+        lines.append(f"No regressions over {factor:g}x the median of the previous {REGRESSION_WINDOW} runs.")
+    return "\n".join(lines)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Span-based tracing for github_auto_publisher.py.
+Spans nest per thread (publish -> binary -> build/copy/structure) and carry
+start and end times, attributes and a status. Log lines are recorded as
+events of the span they happen in. A finished trace is exported as JSON lines,
+one span per line, and as a Chrome trace-event file that can be opened in
+chrome://tracing or Perfetto to find the critical path of a slow publish.
+"""
+
+import os
+import json
+import time
+import itertools
+import threading
+from contextlib import contextmanager
+
+class Span:
+    def __init__(self, span_id, name, parent_id, attributes):
+        """Start a span now"""
+        self.span_id = span_id
+        self.name = name
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.end = None
+        # "ok" or "error", set when the span ends unless already failed
+        self.status = None
+        self.error = None
+        self.events = []
+
+    def set(self, **attributes):
+        """Add or overwrite attributes"""
+        self.attributes.update(attributes)
+
+    def fail(self, error):
+        """Mark the span as failed"""
+        self.status = "error"
+        self.error = str(error)
+
+    @property
+    def duration(self):
+        """Seconds the span took, or so far"""
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self):
+        """Return the span as plain data"""
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "thread": self.thread,
+            "start": self.start,
+            "end": self.end,
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+class Tracer:
+    def __init__(self):
+        """Initialize an empty trace"""
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.spans = []
+        # Events logged outside of any span, e.g. from output reader threads
+        self.events = []
+        self.local = threading.local()
+        self.start = time.time()
+
+    def stack(self):
+        """Return the stack of open spans of the calling thread"""
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def current(self):
+        """Return the innermost open span of the calling thread, or None"""
+        stack = self.stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Open a span as a child of the current span of the calling thread"""
+        parent = self.current()
+        with self.lock:
+            span = Span(next(self.ids), name, parent.span_id if parent else None, attributes)
+            self.spans.append(span)
+
+        stack = self.stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            stack.pop()
+            span.end = time.time()
+            if span.status is None:
+                span.status = "ok"
+
+    @contextmanager
+    def attach(self, span):
+        """Make span the current span of the calling thread, e.g. a worker thread of a pool"""
+        stack = self.stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+
+    def annotate(self, **attributes):
+        """Add attributes to the current span of the calling thread, if there is one"""
+        span = self.current()
+        if span is not None:
+            span.set(**attributes)
+
+    def event(self, name, message=""):
+        """Record a log line as an event of the current span"""
+        event = {"time": time.time(), "name": name, "message": message,
+                 "thread": threading.current_thread().name}
+        span = self.current()
+        with self.lock:
+            (span.events if span is not None else self.events).append(event)
+
+    def export_jsonl(self, path):
+        """Write one finished span per line, in start order"""
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+
+    def export_chrome(self, path):
+        """Write the trace in the Chrome trace-event format"""
+        pid = os.getpid()
+        threads = {}
+
+        def tid(thread_name):
+            return threads.setdefault(thread_name, len(threads) + 1)
+
+        def micros(timestamp):
+            return int((timestamp - self.start) * 1e6)
+
+        trace_events = []
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+            events = list(self.events)
+        for span in spans:
+            args = dict(span.attributes, status=span.status)
+            if span.error:
+                args["error"] = span.error
+            trace_events.append({"name": span.name, "cat": "publish", "ph": "X", "pid": pid,
+                                 "tid": tid(span.thread), "ts": micros(span.start),
+                                 "dur": micros(span.end or time.time()) - micros(span.start), "args": args})
+            events.extend(span.events)
+        for event in events:
+            trace_events.append({"name": event["name"], "cat": "log", "ph": "i", "s": "t", "pid": pid,
+                                 "tid": tid(event["thread"]), "ts": micros(event["time"]),
+                                 "args": {"message": event["message"]}})
+        for thread_name, thread_id in threads.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                                 "args": {"name": thread_name}})
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
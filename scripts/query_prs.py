@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Query the PR metadata store maintained by generate_index_files.py.
+
+Usage:
+    python3 scripts/query_prs.py label "C-Bug"
+    python3 scripts/query_prs.py month 2025-03
+    python3 scripts/query_prs.py missing zh-cn
+    python3 scripts/query_prs.py labels
+"""
+
+import os
+import sys
+import argparse
+
+from pr_store import PRMetadataStore
+
+# Project root directory
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Metadata store written by generate_index_files.py
+STORE_FILE = os.path.join(ROOT_DIR, ".cache", "pr_metadata.sqlite3")
+
+def print_files(rows):
+    """Print (path, title) rows"""
+    for path, title in rows:
+        print(f"{path}\t{title or ''}")
+    print(f"{len(rows)} files", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the PR metadata store")
+    parser.add_argument("--store", default=STORE_FILE,
+                        help="Path of the SQLite metadata store (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    label_parser = subparsers.add_parser("label", help="List PR files carrying a label")
+    label_parser.add_argument("label")
+    month_parser = subparsers.add_parser("month", help="List PR files of a month (YYYY-MM or repo/YYYY-MM)")
+    month_parser.add_argument("month")
+    missing_parser = subparsers.add_parser("missing", help="List PRs without a version in a language")
+    missing_parser.add_argument("language")
+    subparsers.add_parser("labels", help="List labels by number of files")
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    if not os.path.exists(args.store):
+        print(f"Metadata store not found: {args.store}", file=sys.stderr)
+        print("Run scripts/generate_index_files.py first.", file=sys.stderr)
+        return 1
+
+    store = PRMetadataStore(args.store)
+    if args.command == "label":
+        print_files(store.prs_by_label(args.label))
+    elif args.command == "month":
+        print_files(store.prs_by_month(args.month))
+    elif args.command == "missing":
+        rows = store.missing_translation(args.language)
+        for month, pr_number, title in rows:
+            print(f"{month}\t{title or '#' + pr_number}")
+        print(f"{len(rows)} PRs", file=sys.stderr)
+    elif args.command == "labels":
+        for label, count in store.label_counts():
+            print(f"{count}\t{label}")
+    store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Content-hashed file names for published WASM artifacts.
+The module is renamed to <name>_bg.<hash>.wasm, the reference to it inside the
+wasm-bindgen glue code is rewritten, and the glue code is then renamed to
+app.<hash>.js, so both files can be cached as immutable. A manifest maps the
+logical names to the fingerprinted ones.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+# Hex digits of the content hash kept in a file name
+HASH_LENGTH = 16
+# Manifest written next to the artifacts of a project
+MANIFEST_NAME = "wasm_manifest.json"
+
+def fingerprint_name(filename, data):
+    """Insert the content hash of data before the extension of filename"""
+    stem, ext = os.path.splitext(filename)
+    return "{}.{}{}".format(stem, hashlib.sha256(data).hexdigest()[:HASH_LENGTH], ext)
+
+def fingerprint_pattern(binary_name):
+    """Return a pattern matching every fingerprinted artifact name of a binary"""
+    return re.compile(r"^(app|{}_bg)\.[0-9a-f]{{{}}}\.(js|wasm)$".format(re.escape(binary_name), HASH_LENGTH))
+
+def link_module(js_text, wasm_name, fingerprinted_wasm):
+    """Point the default module URL of wasm-bindgen glue code at the fingerprinted module
+
+    Returns the rewritten code, or None if the code does not reference wasm_name.
+    """
+    pattern = re.compile(r"""(['"])(\./)?{}\1""".format(re.escape(wasm_name)))
+    rewritten, count = pattern.subn(
+        lambda match: match.group(1) + (match.group(2) or "") + fingerprinted_wasm + match.group(1), js_text)
+    return rewritten if count else None
+
+def render_manifest(manifest):
+    """Render the logical to fingerprinted name mapping of a project"""
+    return json.dumps(manifest, indent=2) + "\n"
+
+def stale_artifacts(project_dir, binary_name, current):
+    """Return fingerprinted or unfingerprinted artifacts of a project not listed in current"""
+    pattern = fingerprint_pattern(binary_name)
+    plain = {"app.js", "{}_bg.wasm".format(binary_name)}
+    return sorted(os.path.join(project_dir, filename) for filename in os.listdir(project_dir)
+                  if (pattern.match(filename) or filename in plain) and filename not in current)
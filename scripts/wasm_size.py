@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+WASM size optimization and measurement for github_auto_publisher.py.
+Runs wasm-opt on a built module when it is installed. Without it, debug
+custom sections are stripped by rewriting the module's section list
+directly. Raw and gzip sizes are measured so they can be checked against
+the budgets configured in wasm_publish.toml.
+"""
+
+import os
+import gzip
+import shutil
+from collections import namedtuple
+
+from build_runner import run_logged
+
+WASM_MAGIC = b"\0asm"
+# Custom sections that only carry debug information
+DEBUG_SECTION_PREFIXES = (".debug", "sourceMappingURL", "external_debug_info")
+# Seconds before an optimizer run is stopped
+OPTIMIZE_TIMEOUT = 600
+
+# Sizes in bytes
+WasmSize = namedtuple("WasmSize", ["raw", "gzip"])
+
+def read_leb128(data, pos):
+    """Decode an unsigned LEB128 integer, returns (value, next position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+def strip_debug_sections(data):
+    """Return a module without its debug custom sections, or data unchanged if it is not a WASM module"""
+    if data[:4] != WASM_MAGIC:
+        return data
+
+    kept = [data[:8]]
+    pos = 8
+    while pos < len(data):
+        start = pos
+        section_id = data[pos]
+        size, payload = read_leb128(data, pos + 1)
+        end = payload + size
+        if section_id == 0:
+            name_length, name_start = read_leb128(data, payload)
+            name = data[name_start:name_start + name_length].decode("utf-8", "replace")
+            if name.startswith(DEBUG_SECTION_PREFIXES):
+                pos = end
+                continue
+        kept.append(data[start:end])
+        pos = end
+    return b"".join(kept)
+
+def measure(path):
+    """Return the raw and gzip size of a file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return WasmSize(len(data), len(gzip.compress(data, 9)))
+
+def find_optimizer():
+    """Return the path of wasm-opt, or None if it is not installed"""
+    return shutil.which("wasm-opt")
+
+def optimize_wasm(wasm_path, optimizer_args, strip_debug, log_path):
+    """Optimize a module in place
+
+    Returns a short description of what was done, or raises RuntimeError if the
+    optimizer failed; the module is left untouched in that case.
+    """
+    optimizer = find_optimizer()
+    tmp_path = wasm_path + ".opt.tmp"
+
+    if optimizer is not None:
+        command = [optimizer] + list(optimizer_args) + (["--strip-debug"] if strip_debug else [])
+        command += [wasm_path, "-o", tmp_path]
+        result = run_logged(command, os.path.dirname(wasm_path) or ".", log_path, OPTIMIZE_TIMEOUT)
+        if result.returncode != 0:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise RuntimeError("wasm-opt failed: {}".format(result.tail[-1] if result.tail else "timed out"))
+        os.replace(tmp_path, wasm_path)
+        return "wasm-opt {}".format(" ".join(optimizer_args))
+
+    if not strip_debug:
+        return "skipped (wasm-opt not installed)"
+
+    with open(wasm_path, "rb") as f:
+        data = f.read()
+    stripped = strip_debug_sections(data)
+    if stripped != data:
+        with open(tmp_path, "wb") as f:
+            f.write(stripped)
+        os.replace(tmp_path, wasm_path)
+    return "debug sections stripped (wasm-opt not installed)"
+
+def budget_for(budget_config, binary_name):
+    """Return the size budget of a binary in bytes, or None if it has none"""
+    budget_kb = budget_config.get("binaries", {}).get(binary_name, budget_config.get("default_kb"))
+    return int(budget_kb * 1024) if budget_kb else None
@@ -1,10 +1,12 @@
 #!/bin/bash
 # Development server script with automatic _index.md generation
 
-# Generate _index.md files
-echo "Generating _index.md files..."
-python3 scripts/generate_index_files.py
+# Generate _index.md files and keep them up to date in the background
+echo "Generating _index.md files in watch mode..."
+python3 scripts/generate_index_files.py --watch &
+WATCHER_PID=$!
+trap 'kill $WATCHER_PID 2>/dev/null' EXIT
 
 # Start Zola development server
 echo "Starting Zola development server..."
-zola serve 
\ No newline at end of file
+zola serve
@@ -107,7 +107,8 @@ function initWasmViewer(idValue, wasmPath, callback) {
             
             // Determine correct path based on URL
             var basePath = window.location.pathname.includes('/content/') ? '../' : './';
-            var wasmImportPath = basePath + wasmPath;
+            // Artifacts in the shared store are referenced by absolute URL
+            var wasmImportPath = wasmPath.charAt(0) === '/' ? wasmPath : basePath + wasmPath;
             
             script.textContent = 
                 "import init from '" + wasmImportPath + "';\n" +